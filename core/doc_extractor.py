@@ -184,6 +184,7 @@ class DocumentExtractor:
         self, 
         file_content: BinaryIO, 
         filename: str,
+        source_path: Optional[str] = None,
         **kwargs
     ) -> ExtractedDocument:
         """
@@ -192,6 +193,8 @@ class DocumentExtractor:
         Args:
             file_content: Binary file content
             filename: Original filename
+            source_path: Path of the same content on disk, if any; Docling
+                converts it in place instead of copying it to a temp file
             **kwargs: Additional extraction parameters
             
         Returns:
@@ -214,7 +217,7 @@ class DocumentExtractor:
                 print(f"   Format: {doc_format.upper()}")
                 print(f"   Output will be saved to: {self.output_dir}")
                 print(f"{'='*80}\n")
-                return self._extract_with_docling(file_content, filename, doc_format)
+                return self._extract_with_docling(file_content, filename, doc_format, source_path)
             except Exception as e:
                 logger.warning(f"Docling extraction failed for {filename}: {e}. Trying fallback.")
                 print(f"\n{'!'*80}")
@@ -255,25 +258,32 @@ class DocumentExtractor:
         if not extractor:
             raise ValueError(f"No extractor available for format: {doc_format}")
         
+        # Docling may have consumed the stream before failing
+        if file_content.seekable():
+            file_content.seek(0)
+        
         return extractor(file_content, filename)
 
     def _extract_with_docling(
         self, 
         file_content: BinaryIO, 
         filename: str,
-        doc_format: str
+        doc_format: str,
+        source_path: Optional[str] = None
     ) -> ExtractedDocument:
         """Extract using Docling for maximum structure preservation"""
         
-        # Save to temporary file for Docling
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp:
-            tmp.write(file_content.read())
-            tmp_path = tmp.name
+        # Save to temporary file for Docling unless the content is already on disk
+        tmp_path = None
+        if source_path is None:
+            import tempfile
+            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp:
+                tmp.write(file_content.read())
+                tmp_path = tmp.name
         
         try:
             # Convert document
-            result = self.converter.convert(tmp_path)
+            result = self.converter.convert(source_path or tmp_path)
             
             # Create output subdirectory for this document
             doc_name = Path(filename).stem
@@ -561,7 +571,8 @@ class DocumentExtractor:
             
         finally:
             # Cleanup
-            Path(tmp_path).unlink(missing_ok=True)
+            if tmp_path:
+                Path(tmp_path).unlink(missing_ok=True)
     
     def _inject_image_descriptions(self, text: str, extracted_images: List[Dict]) -> str:
         """
@@ -5,6 +5,8 @@ Supports enterprise-grade models like nomic-embed-text and BGE for high-accuracy
 
 import logging
 import os
+from functools import lru_cache
+from hashlib import blake2b
 from pathlib import Path
 from typing import List, Optional, Union
 import numpy as np
@@ -21,6 +23,12 @@ except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     SUPPORTS_LOCAL_FILES_ONLY = False
 
+try:
+    from diskcache import FanoutCache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # Local model cache directory
@@ -73,6 +81,10 @@ class LocalEmbedder:
         }
     }
 
+    # All preconfigured models use uncased tokenizers, so query case does not
+    # change their embeddings; arbitrary HF models may be cased
+    _UNCASED_MODELS = frozenset(config['name'] for config in MODEL_CONFIGS.values())
+
     def __init__(
         self,
         model_name: str = 'minilm',  # Changed default to reliable minilm
@@ -80,7 +92,9 @@ class LocalEmbedder:
         normalize_embeddings: bool = True,
         batch_size: Optional[int] = None,
         local_files_only: bool = False,  # Default to False to allow initial download
-        cache_folder: Optional[str] = None
+        cache_folder: Optional[str] = None,
+        cache_size: int = 10000,
+        disk_cache_dir: Optional[str] = None
     ):
         """
         Initialize local embedder with specified model.
@@ -92,6 +106,9 @@ class LocalEmbedder:
             batch_size: Override default batch size
             local_files_only: If True, only use locally cached models (offline mode)
             cache_folder: Custom cache folder path (defaults to models/embeddings/)
+            cache_size: Number of query embeddings kept in the in-memory LRU cache
+            disk_cache_dir: Directory for the persistent query embedding cache
+                shared across workers and restarts (None to disable)
         """
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             raise ImportError(
@@ -119,6 +136,18 @@ class LocalEmbedder:
         self.batch_size = batch_size or self.config['batch_size']
         self.dimension = self.config['dimension']
         
+        # Repeated queries skip the forward pass; keyed by normalized query text
+        self._cached_query_embedding = lru_cache(maxsize=cache_size)(self._compute_query_embedding)
+        
+        # Second-level cache on disk so warm embeddings survive worker restarts
+        self._disk_cache = None
+        if disk_cache_dir:
+            if DISKCACHE_AVAILABLE:
+                self._disk_cache = FanoutCache(disk_cache_dir, shards=8, size_limit=2**32)
+                logger.info(f"Query embedding disk cache: {disk_cache_dir}")
+            else:
+                logger.warning("diskcache not installed; query embeddings will only be cached in memory")
+        
         # Load model
         logger.info(f"Loading embedding model: {self.config['name']}")
         logger.info(f"Cache folder: {self.cache_folder}")
@@ -222,19 +251,44 @@ class LocalEmbedder:
         """
         Generate embedding for a search query.
         
-        Some models (like BGE) benefit from query prefixes.
+        Some models (like BGE) benefit from query prefixes. Results are cached
+        by whitespace-stripped query, lowercased as well for the preconfigured
+        models, whose uncased tokenizers make case irrelevant.
         
         Args:
             query: Search query text
             
         Returns:
-            Query embedding vector
+            Query embedding vector (a float32 copy, safe to modify)
         """
+        query = query.strip()
+        if self.config['name'] in self._UNCASED_MODELS:
+            query = query.lower()
+        return self._cached_query_embedding(query).astype(np.float32)
+
+    def _compute_query_embedding(self, query: str) -> np.ndarray:
+        """
+        Embed a normalized query; wrapped by the query cache.
+        Cached vectors are stored as float16 to halve memory and disk use.
+        """
+        # Key includes the model so switching models never returns stale vectors
+        key = None
+        if self._disk_cache is not None:
+            key = blake2b(f"{self.config['name']}\0{query}".encode(), digest_size=16).digest()
+            cached = self._disk_cache.get(key)
+            if cached is not None:
+                return np.frombuffer(cached, dtype=np.float16)
+        
         # Add query prefix for BGE models
         if 'bge' in self.config['name'].lower():
             query = f"Represent this sentence for searching relevant passages: {query}"
         
-        return self.embed_text(query, convert_to_numpy=True)
+        embedding = self.embed_text(query, convert_to_numpy=True).astype(np.float16)
+        
+        if key is not None:
+            self._disk_cache.set(key, embedding.tobytes())
+        
+        return embedding
 
     def embed_documents(
         self,
@@ -352,6 +406,8 @@ def get_embedder(
         # Check if local_files_only should be set from config
         if not kwargs.get('local_files_only') and hasattr(settings, 'embedding_local_only'):
             kwargs['local_files_only'] = settings.embedding_local_only
+        kwargs.setdefault('cache_size', settings.embed_cache_size)
+        kwargs.setdefault('disk_cache_dir', settings.embed_disk_cache_path or None)
     except:
         default_model = 'minilm'  # Safe default
         if 'local_files_only' not in kwargs:
@@ -5,6 +5,7 @@ Provides enterprise-grade retrieval with weighted score fusion.
 
 import logging
 import re
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import json
@@ -22,6 +23,8 @@ except ImportError:
 
 import numpy as np
 
+from utils.semantic_cache import SemanticCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +42,9 @@ class HybridSearchEngine:
         vector_store,
         keyword_index_dir: str = "./data/keyword_index",
         semantic_weight: float = 0.7,
-        lexical_weight: float = 0.3
+        lexical_weight: float = 0.3,
+        semantic_cache_threshold: Optional[float] = 0.95,
+        semantic_cache_ttl: Optional[float] = 60.0
     ):
         """
         Initialize hybrid search engine.
@@ -49,6 +54,11 @@ class HybridSearchEngine:
             keyword_index_dir: Directory for Whoosh keyword indices
             semantic_weight: Weight for semantic scores (0-1)
             lexical_weight: Weight for lexical scores (0-1)
+            semantic_cache_threshold: Cosine similarity above which a previous
+                query's results are reused (None disables the cache)
+            semantic_cache_ttl: Seconds a cached result stays valid; bounds
+                staleness when another process changes the index (None for
+                no expiry)
         """
         self.vector_store = vector_store
         self.keyword_index_dir = Path(keyword_index_dir)
@@ -62,6 +72,20 @@ class HybridSearchEngine:
         # Index cache
         self.whoosh_indices = {}
         
+        # Query parsers per index and a shared BM25 weighting, both stateless
+        # across searches so they are built once instead of per query.
+        # K1 controls term frequency saturation (higher = less saturation)
+        # B controls length normalization (higher = more penalization for long docs)
+        self._keyword_parsers = {}
+        self._bm25_weighting = BM25F(K1=1.5, B=0.75) if WHOOSH_AVAILABLE else None
+        
+        # Result cache for near-duplicate queries, created on first use once
+        # the embedding dimension is known
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self.semantic_cache_ttl = semantic_cache_ttl
+        self._result_cache: Optional[SemanticCache] = None
+        self._result_cache_lock = threading.Lock()
+        
         if not WHOOSH_AVAILABLE:
             logger.warning("Whoosh not available. Hybrid search will use semantic only.")
         
@@ -98,6 +122,7 @@ class HybridSearchEngine:
             # Create index
             idx = index.create_in(str(index_dir), schema)
             self.whoosh_indices[collection_name] = idx
+            self._keyword_parsers.pop(collection_name, None)
             
             logger.info(f"Created keyword index for '{collection_name}'")
             return True
@@ -127,6 +152,19 @@ class HybridSearchEngine:
             logger.warning(f"Failed to load keyword index '{collection_name}': {e}")
             return None
 
+    def _get_keyword_parser(self, collection_name: str, idx):
+        """Get or build the multi-field query parser for a keyword index"""
+        parser = self._keyword_parsers.get(collection_name)
+        if parser is None:
+            # Parse query across content and keywords fields with boosting
+            parser = MultifieldParser(
+                ["content", "keywords"],
+                schema=idx.schema,
+                fieldboosts={'keywords': 1.5}  # Boost keyword field for better precision
+            )
+            self._keyword_parsers[collection_name] = parser
+        return parser
+
     def add_to_keyword_index(
         self,
         collection_name: str,
@@ -167,6 +205,7 @@ class HybridSearchEngine:
                 )
             
             writer.commit()
+            self.vector_store.mark_modified(collection_name)
             logger.info(f"Added {len(documents)} documents to keyword index '{collection_name}'")
             return True
             
@@ -197,37 +236,35 @@ class HybridSearchEngine:
         
         # Convert ChromaDB distances to similarity scores
         # ChromaDB uses L2 (Euclidean) distance - lower is better
-        formatted_results = []
+        ids = results['ids']
+        documents = results['documents']
+        metadatas = results['metadatas']
         distances = results['distances']
+        dists = np.asarray(distances, dtype=np.float64)
         
         # Normalize using min-max scaling for better score distribution
-        min_dist = min(distances) if distances else 0
-        max_dist = max(distances) if distances else 1
-        dist_range = max_dist - min_dist if max_dist > min_dist else 1
-        
-        for i, doc_id in enumerate(results['ids']):
-            distance = distances[i]
-            
-            # Normalize distance to 0-1 range, then invert to get similarity
-            # Min distance -> score 1.0, Max distance -> score 0.0
-            if dist_range > 0:
-                normalized_similarity = 1.0 - ((distance - min_dist) / dist_range)
-            else:
-                normalized_similarity = 1.0
-            
-            # Apply exponential scaling for better discrimination
-            # This emphasizes differences in top results
-            semantic_score = normalized_similarity ** 0.5  # Square root for softer scaling
-            
-            formatted_results.append({
-                'id': doc_id,
-                'text': results['documents'][i],
-                'metadata': results['metadatas'][i],
-                'semantic_score': semantic_score,
-                'distance': distance
-            })
-        
-        return formatted_results
+        min_dist = dists.min()
+        max_dist = dists.max()
+        dist_range = max_dist - min_dist if max_dist > min_dist else 1.0
+        
+        # Normalize distance to 0-1 range, then invert to get similarity
+        # Min distance -> score 1.0, Max distance -> score 0.0
+        normalized_similarity = 1.0 - (dists - min_dist) / dist_range
+        
+        # Apply exponential scaling for better discrimination
+        # This emphasizes differences in top results
+        semantic_scores = np.sqrt(normalized_similarity).tolist()  # Square root for softer scaling
+        
+        return [
+            {
+                'id': ids[i],
+                'text': documents[i],
+                'metadata': metadatas[i],
+                'semantic_score': semantic_scores[i],
+                'distance': distances[i]
+            }
+            for i in range(len(ids))
+        ]
 
     def lexical_search(
         self,
@@ -247,19 +284,9 @@ class HybridSearchEngine:
             return []
         
         try:
-            # Use BM25F with optimized parameters
-            # K1 controls term frequency saturation (higher = less saturation)
-            # B controls length normalization (higher = more penalization for long docs)
-            bm25_weighting = BM25F(K1=1.5, B=0.75)
+            parser = self._get_keyword_parser(collection_name, idx)
             
-            with idx.searcher(weighting=bm25_weighting) as searcher:
-                # Parse query across content and keywords fields with boosting
-                parser = MultifieldParser(
-                    ["content", "keywords"],
-                    schema=idx.schema,
-                    fieldboosts={'keywords': 1.5}  # Boost keyword field for better precision
-                )
-                
+            with idx.searcher(weighting=self._bm25_weighting) as searcher:
                 # Preprocess query
                 processed_query = self._preprocess_query(query_text)
                 query = parser.parse(processed_query)
@@ -270,10 +297,9 @@ class HybridSearchEngine:
                 if not results:
                     return []
                 
-                # Collect all scores for better normalization
-                all_scores = [hit.score for hit in results]
-                max_score = max(all_scores) if all_scores else 1.0
-                min_score = min(all_scores) if all_scores else 0.0
+                # Hits are ranked by score, so the extremes are the first and last hit
+                max_score = results.score(0)
+                min_score = results.score(results.scored_length() - 1)
                 score_range = max_score - min_score if max_score > min_score else 1.0
                 
                 # Format results with improved normalization
@@ -368,14 +394,18 @@ class HybridSearchEngine:
             logger.warning(f"No semantic results found for query in '{collection_name}'")
             return []
         
-        # Get lexical results (may not be available)
-        lexical_results = self.lexical_search(
-            collection_name, query_text, top_k=top_k * 2
-        )
+        # Get lexical results (may not be available); without a keyword
+        # index there is nothing to fuse, so skip the lexical pass entirely
+        if self.get_keyword_index(collection_name) is not None:
+            lexical_results = self.lexical_search(
+                collection_name, query_text, top_k=top_k * 2
+            )
+        else:
+            logger.info(f"No keyword index for '{collection_name}', using semantic search only")
+            lexical_results = []
         
         # If no lexical results, fall back to semantic only
         if not lexical_results:
-            logger.info(f"No keyword index for '{collection_name}', using semantic search only")
             # Add hybrid_score to semantic results
             for result in semantic_results:
                 result['hybrid_score'] = result['semantic_score']
@@ -448,40 +478,51 @@ class HybridSearchEngine:
                     'source': 'lexical'
                 }
         
-        # Calculate hybrid scores with multiple strategies
-        merged_results = []
+        # Calculate hybrid scores with multiple strategies, vectorized over
+        # score and rank columns (rank -1 marks a missing result set)
+        merged_results = list(results_map.values())
+        n = len(merged_results)
         k_rrf = 60  # RRF parameter (standard value)
+        sw, lw = self.semantic_weight, self.lexical_weight
         
-        for doc_id, result in results_map.items():
-            # Strategy 1: Weighted score fusion (traditional)
-            score_fusion = (
-                self.semantic_weight * result['semantic_score'] +
-                self.lexical_weight * result['lexical_score']
-            )
-            
-            # Strategy 2: Reciprocal Rank Fusion (position-based)
-            rrf_score = 0
-            if result['semantic_rank'] is not None:
-                rrf_score += 1 / (k_rrf + result['semantic_rank'] + 1)
-            if result['lexical_rank'] is not None:
-                rrf_score += 1 / (k_rrf + result['lexical_rank'] + 1)
-            
-            # Normalize RRF to 0-1 range (approximate)
-            rrf_normalized = min(rrf_score * k_rrf / 2, 1.0)
-            
-            # Combine strategies: 70% score fusion, 30% RRF
-            hybrid_score = 0.7 * score_fusion + 0.3 * rrf_normalized
-            
-            # Apply bonus for documents found in both result sets (high confidence)
-            if result['source'] == 'both':
-                hybrid_score *= 1.15  # 15% bonus for cross-validation
-            
-            # Clamp to 0-1 range
-            hybrid_score = min(max(hybrid_score, 0.0), 1.0)
-            
+        sem_scores = np.fromiter((r['semantic_score'] for r in merged_results), dtype=np.float64, count=n)
+        lex_scores = np.fromiter((r['lexical_score'] for r in merged_results), dtype=np.float64, count=n)
+        sem_ranks = np.fromiter(
+            (-1 if r['semantic_rank'] is None else r['semantic_rank'] for r in merged_results),
+            dtype=np.float64, count=n
+        )
+        lex_ranks = np.fromiter(
+            (-1 if r['lexical_rank'] is None else r['lexical_rank'] for r in merged_results),
+            dtype=np.float64, count=n
+        )
+        in_semantic = sem_ranks >= 0
+        in_lexical = lex_ranks >= 0
+        
+        # Strategy 1: Weighted score fusion (traditional)
+        score_fusion = sw * sem_scores
+        score_fusion += lw * lex_scores
+        
+        # Strategy 2: Reciprocal Rank Fusion (position-based)
+        rrf_scores = np.where(in_semantic, 1 / (k_rrf + sem_ranks + 1), 0.0)
+        rrf_scores += np.where(in_lexical, 1 / (k_rrf + lex_ranks + 1), 0.0)
+        
+        # Normalize RRF to 0-1 range (approximate)
+        rrf_normalized = np.minimum(rrf_scores * k_rrf / 2, 1.0)
+        
+        # Combine strategies: 70% score fusion, 30% RRF
+        hybrid_scores = 0.7 * score_fusion + 0.3 * rrf_normalized
+        
+        # Apply bonus for documents found in both result sets (high confidence)
+        hybrid_scores[in_semantic & in_lexical] *= 1.15  # 15% bonus for cross-validation
+        
+        # Clamp to 0-1 range
+        np.clip(hybrid_scores, 0.0, 1.0, out=hybrid_scores)
+        
+        for result, hybrid_score, rrf_score in zip(
+            merged_results, hybrid_scores.tolist(), rrf_normalized.tolist()
+        ):
             result['hybrid_score'] = hybrid_score
-            result['rrf_score'] = rrf_normalized
-            merged_results.append(result)
+            result['rrf_score'] = rrf_score
         
         return merged_results
 
@@ -508,6 +549,54 @@ class HybridSearchEngine:
         Returns:
             Search results with scores and metadata
         """
+        if query_embedding is None or self.semantic_cache_threshold is None or search_type == 'lexical':
+            return self._search_uncached(
+                collection_name, query_text, query_embedding, top_k, min_score, search_type
+            )
+        
+        # Cached results are only valid for the same parameters and collection
+        # contents. Lexical scores depend on the exact query terms, so hybrid
+        # results are additionally keyed on the normalized query text; only
+        # pure semantic results are shared between similar queries.
+        query_key = None if search_type == 'semantic' else ' '.join(query_text.lower().split())
+        namespace = (
+            collection_name,
+            self.vector_store.get_collection_version(collection_name),
+            top_k,
+            min_score,
+            search_type,
+            query_key,
+        )
+        if self._result_cache is None:
+            # Searches run on executor threads; create the cache exactly once
+            with self._result_cache_lock:
+                if self._result_cache is None:
+                    self._result_cache = SemanticCache(
+                        dim=int(np.asarray(query_embedding).size),
+                        threshold=self.semantic_cache_threshold,
+                        ttl=self.semantic_cache_ttl,
+                    )
+        
+        cached = self._result_cache.lookup(query_embedding, namespace)
+        if cached is not None:
+            return [dict(result) for result in cached]
+        
+        results = self._search_uncached(
+            collection_name, query_text, query_embedding, top_k, min_score, search_type
+        )
+        self._result_cache.insert(query_embedding, [dict(result) for result in results], namespace)
+        return results
+
+    def _search_uncached(
+        self,
+        collection_name: str,
+        query_text: str,
+        query_embedding: Optional[np.ndarray],
+        top_k: int,
+        min_score: float,
+        search_type: str
+    ) -> List[Dict]:
+        """Dispatch a search to the requested strategy without caching"""
         if search_type == 'semantic':
             if query_embedding is None:
                 raise ValueError("query_embedding required for semantic search")
@@ -537,6 +626,8 @@ class HybridSearchEngine:
             
             if collection_name in self.whoosh_indices:
                 del self.whoosh_indices[collection_name]
+            self._keyword_parsers.pop(collection_name, None)
+            self.vector_store.mark_modified(collection_name)
             
             return True
         except Exception as e:
@@ -5,6 +5,7 @@ Respects document structure and maintains semantic coherence.
 
 import logging
 import re
+from functools import lru_cache
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 
@@ -273,3 +274,21 @@ class SemanticChunker:
             return 1000  # Standard size
         else:
             return 1200  # Larger chunks for long documents
+
+
+@lru_cache(maxsize=8)
+def get_chunker(chunk_size: int = 1000, chunk_overlap: int = 150) -> SemanticChunker:
+    """
+    Get a shared chunker for the given size and overlap.
+    
+    Chunkers load a tokenizer on construction, so instances are cached
+    per configuration and reused across calls.
+    
+    Args:
+        chunk_size: Target token count per chunk
+        chunk_overlap: Overlap between chunks
+        
+    Returns:
+        SemanticChunker instance
+    """
+    return SemanticChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
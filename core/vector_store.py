@@ -4,6 +4,7 @@ Handles embedding storage, retrieval, and collection management.
 """
 
 import logging
+import time
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import json
@@ -35,7 +36,8 @@ class VectorStoreManager:
     def __init__(
         self,
         persist_directory: str = "./data/vector_store",
-        embedding_function: Optional[callable] = None
+        embedding_function: Optional[callable] = None,
+        metadata_cache_ttl: float = 30.0
     ):
         """
         Initialize vector store manager.
@@ -43,6 +45,8 @@ class VectorStoreManager:
         Args:
             persist_directory: Local directory for persistent storage
             embedding_function: Optional custom embedding function
+            metadata_cache_ttl: Seconds to reuse collection listings and info
+                (changes made through this manager invalidate them immediately)
         """
         if not CHROMADB_AVAILABLE:
             raise ImportError(
@@ -63,6 +67,14 @@ class VectorStoreManager:
         
         self.embedding_function = embedding_function
         self.collections = {}
+        # Bumped whenever a collection's contents change so result caches
+        # keyed on the version never serve stale hits
+        self._collection_versions: Dict[str, int] = {}
+        
+        # Short-lived caches of (expiry, value) for collection metadata lookups
+        self.metadata_cache_ttl = metadata_cache_ttl
+        self._names_cache: Optional[Tuple[float, List[str]]] = None
+        self._info_cache: Dict[str, Tuple[float, Dict]] = {}
         
         logger.info(f"VectorStore initialized at: {self.persist_directory}")
 
@@ -111,6 +123,7 @@ class VectorStoreManager:
             )
             
             self.collections[name] = collection
+            self._invalidate_metadata(name)
             logger.info(f"Created collection: {name}")
             return True
             
@@ -124,6 +137,20 @@ class VectorStoreManager:
                 raise ValueError(f"Invalid collection name '{name}': {e}")
             return False
 
+    def get_collection_version(self, name: str) -> int:
+        """Get the modification counter for a collection"""
+        return self._collection_versions.get(name, 0)
+
+    def mark_modified(self, name: str):
+        """Record that a collection's contents changed"""
+        self._collection_versions[name] = self._collection_versions.get(name, 0) + 1
+        self._invalidate_metadata(name)
+
+    def _invalidate_metadata(self, name: str):
+        """Drop cached listing and info after a collection changes"""
+        self._names_cache = None
+        self._info_cache.pop(name, None)
+
     def get_collection(self, name: str):
         """Get or load collection by name"""
         if name in self.collections:
@@ -188,6 +215,7 @@ class VectorStoreManager:
                     ids=ids[i:end_idx]
                 )
             
+            self.mark_modified(collection_name)
             logger.info(f"Added {len(texts)} documents to '{collection_name}'")
             return True
             
@@ -254,6 +282,7 @@ class VectorStoreManager:
             self.client.delete_collection(name=name)
             if name in self.collections:
                 del self.collections[name]
+            self.mark_modified(name)
             logger.info(f"Deleted collection: {name}")
             return True
         except Exception as e:
@@ -262,15 +291,25 @@ class VectorStoreManager:
 
     def list_collections(self) -> List[str]:
         """List all collection names"""
+        cached = self._names_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return list(cached[1])
+        
         try:
             collections = self.client.list_collections()
-            return [col.name for col in collections]
+            names = [col.name for col in collections]
+            self._names_cache = (time.monotonic() + self.metadata_cache_ttl, names)
+            return list(names)
         except Exception as e:
             logger.error(f"Failed to list collections: {e}")
             return []
 
     def get_collection_info(self, name: str) -> Optional[Dict]:
         """Get information about a collection"""
+        cached = self._info_cache.get(name)
+        if cached is not None and cached[0] > time.monotonic():
+            return dict(cached[1])
+        
         collection = self.get_collection(name)
         if not collection:
             return None
@@ -279,11 +318,13 @@ class VectorStoreManager:
             count = collection.count()
             metadata = collection.metadata
             
-            return {
+            info = {
                 'name': name,
                 'count': count,
                 'metadata': metadata,
             }
+            self._info_cache[name] = (time.monotonic() + self.metadata_cache_ttl, info)
+            return dict(info)
         except Exception as e:
             logger.error(f"Failed to get info for '{name}': {e}")
             return None
@@ -315,6 +356,7 @@ class VectorStoreManager:
                 update_params['metadatas'] = metadatas
             
             collection.update(**update_params)
+            self.mark_modified(collection_name)
             logger.info(f"Updated {len(ids)} documents in '{collection_name}'")
             return True
             
@@ -352,6 +394,7 @@ class VectorStoreManager:
                 logger.warning("No deletion criteria provided")
                 return False
             
+            self.mark_modified(collection_name)
             logger.info(f"Deleted documents from '{collection_name}'")
             return True
             
@@ -36,7 +36,7 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 from datetime import datetime
 
-from fastapi import FastAPI, Request, status, HTTPException
+from fastapi import FastAPI, Request, status, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.exceptions import RequestValidationError
@@ -50,7 +50,7 @@ configure_logging()
 logger = get_logger(__name__)
 
 from routes import models_router, generate_router
-from routes.ingestion_routes import router as ingestion_router
+from routes.ingestion_routes import router as ingestion_router, start_warmup as start_rag_warmup
 from routes.analytics import router as analytics_router
 from routes.metabase_routes import router as metabase_router
 from routes.auth_routes import router as auth_router
@@ -61,11 +61,11 @@ try:
     TRAINING_AVAILABLE = True
 except ImportError as e:
     logger.warning(f"Training module not available: {e}")
-    logger.warning("Install training dependencies with: pip install datasets>=2.14.0 peft>=0.7.0")
+    logger.warning("Install training dependencies with: pip install datasets>=2.14.0 peft>=0.10.0 transformers>=4.39.0")
     TRAINING_AVAILABLE = False
     training_router = None
 
-from services import get_ollama_service, cleanup_ollama_service
+from services import OllamaService, get_ollama_service
 from services.analytics_service import get_analytics_service, cleanup_analytics_service
 from schemas import HealthResponse, ErrorResponse
 
@@ -97,8 +97,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     except Exception as e:
         logger.warning(f"authentication_database_init_failed: {e}")
     
-    # Verify Ollama connection
-    ollama_service = get_ollama_service()
+    # Load the embedding model and vector store in the background while the
+    # rest of startup runs, so the first RAG request sees steady-state latency
+    start_rag_warmup()
+    
+    # Create the shared Ollama service and verify the connection
+    ollama_service = OllamaService()
+    app.state.ollama = ollama_service
     is_healthy = await ollama_service.check_health()
     
     if is_healthy:
@@ -113,8 +118,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     
     # Shutdown
     logger.info("application_shutdown")
-    await cleanup_ollama_service()
+    await ollama_service.close()
     await cleanup_analytics_service()
+    if TRAINING_AVAILABLE:
+        from services.training_data_service import cleanup_training_data_service
+        await cleanup_training_data_service()
 
 
 # Initialize FastAPI app
@@ -332,14 +340,15 @@ async def general_exception_handler(request: Request, exc: Exception):
     summary="Health check",
     description="Check the health status of the API and Ollama connection."
 )
-async def health_check() -> HealthResponse:
+async def health_check(
+    ollama_service: OllamaService = Depends(get_ollama_service)
+) -> HealthResponse:
     """
     Perform health check.
     
     Returns:
         HealthResponse with service status and Ollama connection info
     """
-    ollama_service = get_ollama_service()
     ollama_connected = await ollama_service.check_health()
     
     return HealthResponse(
@@ -29,6 +29,13 @@ from mcp.types import (
 )
 import httpx
 
+# libuv-based event loop (not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -449,5 +456,13 @@ async def main():
         await server.cleanup()
 
 
+def run():
+    """Run the server on uvloop when installed, otherwise the default asyncio loop"""
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
@@ -5,13 +5,12 @@ Start the MCP Server for LLM-365
 
 import os
 import sys
-import asyncio
 import logging
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from mcp_server.server import main
+from mcp_server.server import run
 
 if __name__ == "__main__":
     # Configure logging to stderr only (stdout is reserved for JSON-RPC)
@@ -30,4 +29,4 @@ if __name__ == "__main__":
     logger.info("Starting MCP server on stdio...")
     logger.info("=" * 60)
     
-    asyncio.run(main())
+    run()
@@ -2,11 +2,12 @@
 API routes for text generation.
 Provides endpoint for generating text using local LLM models.
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 
 from schemas import GenerateRequest, GenerateResponse, SourceCitation, ErrorResponse
 from services import (
+    OllamaService,
     get_ollama_service,
     get_context_handler,
     OllamaConnectionError,
@@ -209,7 +210,10 @@ async def fetch_relevant_context(
         }
     }
 )
-async def generate_text(request: GenerateRequest) -> GenerateResponse:
+async def generate_text(
+    request: GenerateRequest,
+    ollama_service: OllamaService = Depends(get_ollama_service)
+) -> GenerateResponse:
     """
     Generate text completion using specified model.
     
@@ -363,7 +367,6 @@ async def generate_text(request: GenerateRequest) -> GenerateResponse:
         modified_request.prompt = augmented_prompt
         
         # Generate text
-        ollama_service = get_ollama_service()
         result = await ollama_service.generate(modified_request)
         
         # Get the generated response
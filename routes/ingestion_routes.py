@@ -3,7 +3,11 @@ Document ingestion and hybrid search API routes.
 Endpoints for uploading documents, searching, and managing indices.
 """
 
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List, Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Form
 from pydantic import BaseModel, Field
@@ -44,6 +48,29 @@ _vector_store = None
 _hybrid_search = None
 _image_processor = None
 
+# Separate locks so the embedder and search engine can still warm up in
+# parallel; get_hs takes _vs_lock inside _hs_lock, never the reverse
+_embedder_lock = threading.Lock()
+_vs_lock = threading.Lock()
+_hs_lock = threading.Lock()
+
+# Blocking vector store, embedder and index calls run here so independent
+# steps of a request can overlap without stalling the event loop
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag")
+
+# Per-result debug line, %-formatted only when debug logging is enabled
+_RESULT_LOG_TPL = "Result #%d %s: semantic=%.4f lexical=%.4f hybrid=%.4f source=%s"
+
+# Score field reported for each search type
+_SCORE_KEYS = {
+    'hybrid': 'hybrid_score',
+    'semantic': 'semantic_score',
+    'lexical': 'lexical_score',
+}
+
+# Background task that loads the embedder and vector store at startup
+_warmup_task: Optional[asyncio.Task] = None
+
 
 def get_doc_extractor() -> DocumentExtractor:
     """Get or create document extractor"""
@@ -70,7 +97,9 @@ def get_local_embedder() -> LocalEmbedder:
     """Get or create embedder"""
     global _embedder
     if _embedder is None:
-        _embedder = get_embedder(model_name=settings.embedding_model)
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = get_embedder(model_name=settings.embedding_model)
     return _embedder
 
 
@@ -86,7 +115,9 @@ def get_vs() -> VectorStoreManager:
     """Get or create vector store"""
     global _vector_store
     if _vector_store is None:
-        _vector_store = get_vector_store(persist_directory=settings.vector_store_path)
+        with _vs_lock:
+            if _vector_store is None:
+                _vector_store = get_vector_store(persist_directory=settings.vector_store_path)
     return _vector_store
 
 
@@ -94,13 +125,17 @@ def get_hs() -> HybridSearchEngine:
     """Get or create hybrid search"""
     global _hybrid_search
     if _hybrid_search is None:
-        vs = get_vs()
-        _hybrid_search = HybridSearchEngine(
-            vector_store=vs,
-            keyword_index_dir=settings.keyword_index_path,
-            semantic_weight=settings.semantic_weight,
-            lexical_weight=settings.lexical_weight
-        )
+        with _hs_lock:
+            if _hybrid_search is None:
+                vs = get_vs()
+                _hybrid_search = HybridSearchEngine(
+                    vector_store=vs,
+                    keyword_index_dir=settings.keyword_index_path,
+                    semantic_weight=settings.sw,
+                    lexical_weight=settings.lw,
+                    semantic_cache_threshold=settings.semantic_cache_threshold,
+                    semantic_cache_ttl=settings.semantic_cache_ttl
+                )
     return _hybrid_search
 
 
@@ -116,6 +151,44 @@ def get_img_processor() -> ImageProcessor:
     return _image_processor
 
 
+async def _warmup():
+    """Load the embedding model and vector store/search engine concurrently"""
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        loop.run_in_executor(_executor, get_local_embedder),
+        loop.run_in_executor(_executor, get_hs),
+        return_exceptions=True,
+    )
+    failed = []
+    for component, result in zip(("embedder", "hybrid_search"), results):
+        if isinstance(result, Exception):
+            # Requests will retry the lazy initialization and report the error
+            logger.warning(f"RAG warmup failed for {component}: {result}")
+            failed.append(component)
+    
+    if failed:
+        logger.warning(f"RAG warmup incomplete; failed components: {', '.join(failed)}")
+    else:
+        logger.info("RAG components warmed up")
+
+
+def start_warmup():
+    """
+    Schedule loading of the RAG components in the background.
+    Called once at application startup so the first request does not
+    absorb model load latency.
+    """
+    global _warmup_task
+    if _warmup_task is None:
+        _warmup_task = asyncio.create_task(_warmup())
+
+
+async def wait_for_warmup():
+    """Wait for startup warmup (if any) so requests don't load components twice"""
+    if _warmup_task is not None and not _warmup_task.done():
+        await asyncio.shield(_warmup_task)
+
+
 # Response Models
 class IngestionResponse(BaseModel):
     """Response for document ingestion"""
@@ -266,26 +339,18 @@ async def ingest_document(
             except Exception as img_proc_err:
                 logger.error(f"Image processing failed: {img_proc_err}. Continuing with text only.")
         
-        # Step 4: Generate embeddings for text chunks
+        # Step 4-5: Generate embeddings for text and image chunks in one batched pass
         all_chunks = text_chunks.copy()
+        await wait_for_warmup()
         embedder = get_local_embedder()
         
         chunk_texts = [chunk.text for chunk in text_chunks]
-        text_embeddings = embedder.embed_documents(chunk_texts, show_progress=False)
+        image_texts = [chunk['text'] for chunk in image_chunks]
+        all_embeddings = list(embedder.embed_documents(chunk_texts + image_texts, show_progress=False))
         
-        logger.info(f"Generated {len(text_embeddings)} text embeddings")
-        
-        # Step 5: Generate embeddings for image chunks
-        image_embeddings = []
-        if image_chunks:
-            image_texts = [chunk['text'] for chunk in image_chunks]
-            image_embeddings = embedder.embed_documents(image_texts, show_progress=False)
-            logger.info(f"Generated {len(image_embeddings)} image description embeddings")
-        
-        # Combine all embeddings
-        all_embeddings = list(text_embeddings)
-        if image_embeddings is not None and len(image_embeddings) > 0:
-            all_embeddings.extend(image_embeddings)
+        logger.info(f"Generated {len(chunk_texts)} text embeddings")
+        if image_texts:
+            logger.info(f"Generated {len(image_texts)} image description embeddings")
         
         # Step 6: Extract keywords (if enabled)
         keyword_docs = []
@@ -430,12 +495,16 @@ async def search_documents(
     """
     try:
         top_k = top_k or settings.default_top_k
+        await wait_for_warmup()
         
         logger.info(f"Searching '{query}' in {index_name} (type: {search_type}, top_k: {top_k})")
         
-        # Verify index exists
-        vs = get_vs()
-        available_indices = vs.list_collections()
+        # Listing indices and embedding the query are independent, so run both at once
+        loop = asyncio.get_running_loop()
+        available_indices, query_embedding = await asyncio.gather(
+            loop.run_in_executor(_executor, lambda: get_vs().list_collections()),
+            loop.run_in_executor(_executor, lambda: get_local_embedder().embed_query(query)),
+        )
         logger.info(f"Available indices: {available_indices}")
         
         if index_name not in available_indices:
@@ -444,22 +513,20 @@ async def search_documents(
                 detail=f"Index '{index_name}' not found. Available indices: {', '.join(available_indices) if available_indices else 'none'}"
             )
         
-        # Generate query embedding
-        logger.info(f"Generating query embedding for: '{query}'")
-        embedder = get_local_embedder()
-        query_embedding = embedder.embed_query(query)
         logger.info(f"Query embedding generated: shape {query_embedding.shape if hasattr(query_embedding, 'shape') else len(query_embedding)}")
         
         # Perform search
         logger.info(f"Performing {search_type} search...")
+        # Vector query, BM25 scoring and fusion block, so keep them off the event loop
         hs = get_hs()
-        results = hs.search(
+        results = await loop.run_in_executor(_executor, partial(
+            hs.search,
             collection_name=index_name,
             query_text=query,
             query_embedding=query_embedding,
             top_k=top_k,
             search_type=search_type
-        )
+        ))
         
         logger.info(f"Search returned {len(results)} raw results")
         
@@ -469,17 +536,23 @@ async def search_documents(
             logger.warning(f"No results found for query: '{query}' in index: '{index_name}'")
         else:
             logger.info(f"Processing {len(results)} results")
+        
+        # Determine score field based on search type
+        score_key = _SCORE_KEYS.get(search_type, 'lexical_score')
+        log_results = logger.isEnabledFor(logging.DEBUG)
+        
+        for i, result in enumerate(results):
+            score = result.get(score_key, 0)
             
-        for result in results:
-            # Determine score based on search type
-            if search_type == 'hybrid':
-                score = result.get('hybrid_score', 0)
-            elif search_type == 'semantic':
-                score = result.get('semantic_score', 0)
-            else:  # lexical
-                score = result.get('lexical_score', 0)
-            
-            logger.debug(f"Result {result.get('id')}: score={score}, source={result.get('source')}")
+            if log_results:
+                logger.debug(_RESULT_LOG_TPL % (
+                    i + 1,
+                    result.get('id'),
+                    result.get('semantic_score', 0.0),
+                    result.get('lexical_score', 0.0),
+                    result.get('hybrid_score', 0.0),
+                    result.get('source', 'unknown'),
+                ))
             
             search_results.append(SearchResult(
                 text=result.get('text', ''),
@@ -512,6 +585,7 @@ async def list_indices():
     Returns collection names with document counts and metadata.
     """
     try:
+        await wait_for_warmup()
         vs = get_vs()
         collection_names = vs.list_collections()
         
@@ -543,6 +617,7 @@ async def delete_index(index_name: str):
     Removes both vector store collection and keyword index.
     """
     try:
+        await wait_for_warmup()
         vs = get_vs()
         hs = get_hs()
         
@@ -577,11 +652,12 @@ async def get_statistics():
     Returns information about all indices, model info, and configuration.
     """
     try:
-        vs = get_vs()
-        embedder = get_local_embedder()
-        
-        stats = vs.get_statistics()
-        model_info = embedder.get_model_info()
+        await wait_for_warmup()
+        loop = asyncio.get_running_loop()
+        stats, model_info = await asyncio.gather(
+            loop.run_in_executor(_executor, lambda: get_vs().get_statistics()),
+            loop.run_in_executor(_executor, lambda: get_local_embedder().get_model_info()),
+        )
         
         return {
             "vector_store": stats,
@@ -604,8 +680,13 @@ async def get_statistics():
 async def health_check():
     """Check if RAG system is healthy"""
     try:
-        vs = get_vs()
-        embedder = get_local_embedder()
+        await wait_for_warmup()
+        # Load the vector store and embedding model concurrently on first use
+        loop = asyncio.get_running_loop()
+        _, embedder = await asyncio.gather(
+            loop.run_in_executor(_executor, get_vs),
+            loop.run_in_executor(_executor, get_local_embedder),
+        )
         
         return {
             "status": "healthy",
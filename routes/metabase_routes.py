@@ -7,12 +7,13 @@ Completely independent from existing RAG functionality.
 import asyncio
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, status, Request
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, status, Request, Depends
 from fastapi.responses import JSONResponse, FileResponse
 from pydantic import BaseModel, Field
 
 from services.metabase_dataset_service import get_metabase_dataset_service
 from services.metabase_dashboard_service import get_metabase_dashboard_service
+from services.ollama_service import OllamaService, get_ollama_service
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -284,7 +285,10 @@ async def delete_dataset(dataset_id: int):
     summary="Generate AI insights",
     description="Generate AI-powered insights and recommendations from the dataset using local LLM."
 )
-async def generate_insights(dataset_id: int) -> InsightResponse:
+async def generate_insights(
+    dataset_id: int,
+    ollama_service: OllamaService = Depends(get_ollama_service)
+) -> InsightResponse:
     """
     Generate AI-powered insights from dataset.
     
@@ -298,7 +302,7 @@ async def generate_insights(dataset_id: int) -> InsightResponse:
     """
     try:
         dashboard_service = get_metabase_dashboard_service()
-        insights = await dashboard_service.generate_ai_insights(dataset_id)
+        insights = await dashboard_service.generate_ai_insights(dataset_id, ollama_service)
         
         return InsightResponse(**insights)
         
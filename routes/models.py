@@ -16,6 +16,7 @@ from schemas import (
     ErrorResponse
 )
 from services import (
+    OllamaService,
     get_ollama_service,
     OllamaConnectionError,
     ModelNotFoundError,
@@ -39,7 +40,8 @@ router = APIRouter(prefix="/models", tags=["Models"])
 )
 async def get_download_progress(
     model_name: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ollama_service: OllamaService = Depends(get_ollama_service)
 ) -> Dict[str, Any]:
     """
     Get download progress for a specific model.
@@ -51,7 +53,6 @@ async def get_download_progress(
         Progress information dictionary
     """
     try:
-        ollama_service = get_ollama_service()
         progress = ollama_service.get_download_progress(model_name)
         
         if progress is None:
@@ -83,7 +84,8 @@ async def get_download_progress(
 )
 async def clear_download_progress(
     model_name: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ollama_service: OllamaService = Depends(get_ollama_service)
 ) -> Dict[str, str]:
     """
     Clear download progress tracking for a model.
@@ -95,7 +97,6 @@ async def clear_download_progress(
         Success message
     """
     try:
-        ollama_service = get_ollama_service()
         ollama_service.clear_download_progress(model_name)
         
         return {
@@ -125,7 +126,10 @@ async def clear_download_progress(
     },
     dependencies=[Depends(ResourcePermissionChecker("models", "read"))]
 )
-async def list_models(current_user: User = Depends(get_current_user)) -> ModelsListResponse:
+async def list_models(
+    current_user: User = Depends(get_current_user),
+    ollama_service: OllamaService = Depends(get_ollama_service)
+) -> ModelsListResponse:
     """
     List all locally available Ollama models.
     
@@ -133,7 +137,6 @@ async def list_models(current_user: User = Depends(get_current_user)) -> ModelsL
         ModelsListResponse with list of models and count
     """
     try:
-        ollama_service = get_ollama_service()
         models_data = await ollama_service.list_models()
         
         # Parse model information
@@ -188,7 +191,8 @@ async def list_models(current_user: User = Depends(get_current_user)) -> ModelsL
 )
 async def download_model(
     request: ModelDownloadRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ollama_service: OllamaService = Depends(get_ollama_service)
 ) -> ModelDownloadResponse:
     """
     Download a new model using Ollama CLI.
@@ -200,7 +204,6 @@ async def download_model(
         ModelDownloadResponse with status
     """
     try:
-        ollama_service = get_ollama_service()
         result = await ollama_service.download_model(request.model_name)
         
         return ModelDownloadResponse(
@@ -249,7 +252,8 @@ async def download_model(
 )
 async def delete_model(
     model_name: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ollama_service: OllamaService = Depends(get_ollama_service)
 ) -> ModelDeleteResponse:
     """
     Delete a model from local storage.
@@ -261,7 +265,6 @@ async def delete_model(
         ModelDeleteResponse with status
     """
     try:
-        ollama_service = get_ollama_service()
         result = await ollama_service.delete_model(model_name)
         
         return ModelDeleteResponse(
@@ -263,8 +263,8 @@ async def create_model_from_training(request: ModelCreateRequest) -> ModelCreate
         
         # Get job info
         job = training_service.jobs[request.job_id]
-        model_path = job.get("model_path")
-        model_name = job["model_name"]
+        model_path = job.model_path
+        model_name = job.model_name
         
         if not model_path:
             raise HTTPException(
@@ -288,8 +288,8 @@ async def create_model_from_training(request: ModelCreateRequest) -> ModelCreate
                 conversion_service = get_conversion_service()
                 
                 # Get training metadata
-                base_model = job.get("base_model", "unknown")
-                technique = job.get("technique", "lora")
+                base_model = job.base_model
+                technique = job.technique
                 
                 # Generate Ollama model name
                 ollama_model = f"{model_name}_ollama"
@@ -546,7 +546,8 @@ async def generate_training_data_from_pdf(
     model: str = Form("llama2"),
     max_samples: Optional[int] = Form(None),
     chunk_size: int = Form(500),
-    chunk_overlap: int = Form(50)
+    chunk_overlap: int = Form(50),
+    output_format: str = Form("jsonl")
 ):
     """
     Generate training data from a PDF file.
@@ -555,9 +556,15 @@ async def generate_training_data_from_pdf(
     1. Extract text from the PDF
     2. Chunk the text into manageable pieces
     3. Use an LLM to generate question-answer pairs
-    4. Save as JSONL in LoRA training format
+    4. Save as JSONL in LoRA training format (plus Parquet if requested)
     """
     try:
+        if output_format not in ("jsonl", "parquet"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="output_format must be 'jsonl' or 'parquet'"
+            )
+        
         # Validate file type
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(
@@ -582,7 +589,8 @@ async def generate_training_data_from_pdf(
             model=model,
             max_samples=max_samples,
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            output_format=output_format
         )
         
         return {
@@ -2,7 +2,6 @@
 from services.ollama_service import (
     OllamaService,
     get_ollama_service,
-    cleanup_ollama_service,
     OllamaServiceError,
     OllamaConnectionError,
     ModelNotFoundError
@@ -12,7 +11,6 @@ from services.context_handler import ContextHandler, get_context_handler
 __all__ = [
     "OllamaService",
     "get_ollama_service",
-    "cleanup_ollama_service",
     "OllamaServiceError",
     "OllamaConnectionError",
     "ModelNotFoundError",
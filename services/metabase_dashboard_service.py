@@ -13,7 +13,7 @@ import sqlite3
 from datetime import datetime
 
 from services.metabase_dataset_service import get_metabase_dataset_service
-from services.ollama_service import get_ollama_service
+from services.ollama_service import OllamaService
 from utils.logger import get_logger
 from utils.config import get_settings
 
@@ -331,7 +331,11 @@ class MetabaseDashboardService:
             logger.error(f"Failed to get dashboard URL: {e}")
             return None
     
-    async def generate_ai_insights(self, dataset_id: int) -> Dict[str, Any]:
+    async def generate_ai_insights(
+        self,
+        dataset_id: int,
+        ollama_service: OllamaService
+    ) -> Dict[str, Any]:
         """
         Generate AI-powered insights from the dataset using local LLM.
         This uses Ollama to analyze data patterns and provide recommendations.
@@ -354,8 +358,6 @@ class MetabaseDashboardService:
             prompt = self._create_analysis_prompt(dataset, metadata, insights_from_db, sample_data)
             
             # Use Ollama to generate insights
-            ollama_service = get_ollama_service()
-            
             # Import GenerateRequest schema
             from schemas.request_schemas import GenerateRequest
             
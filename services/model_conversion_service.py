@@ -11,7 +11,6 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 
 from utils.logger import get_logger
-from services.ollama_service import get_ollama_service
 
 logger = get_logger(__name__)
 
@@ -21,7 +20,6 @@ class ModelConversionService:
     
     def __init__(self):
         """Initialize model conversion service."""
-        self.ollama_service = get_ollama_service()
         self.converted_models_dir = Path("models/ollama_converted")
         self.converted_models_dir.mkdir(parents=True, exist_ok=True)
         
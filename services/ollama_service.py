@@ -5,10 +5,12 @@ Handles all communication with Ollama HTTP API and CLI operations.
 import asyncio
 import subprocess
 import re
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 import httpx
+from fastapi import Request
 from httpx import AsyncClient, ConnectError, TimeoutException
 
 from utils.config import get_settings
@@ -17,6 +19,9 @@ from schemas.request_schemas import GenerateRequest
 
 logger = get_logger(__name__)
 
+# How long a successful health check is reused before Ollama is probed again
+HEALTH_CACHE_TTL_SECONDS = 0.5
+
 
 class OllamaServiceError(Exception):
     """Base exception for Ollama service errors."""
@@ -39,13 +44,21 @@ class OllamaService:
     Provides async methods for model management and text generation.
     """
     
-    def __init__(self):
-        """Initialize Ollama service with settings."""
+    def __init__(self, client: Optional[AsyncClient] = None):
+        """
+        Initialize Ollama service with settings.
+        
+        Args:
+            client: Preconfigured HTTP client to use instead of creating one
+                lazily; the service takes ownership and closes it in close()
+        """
         self.settings = get_settings()
-        self.client: Optional[AsyncClient] = None
+        self.client: Optional[AsyncClient] = client
         self._client_lock = asyncio.Lock()
         # Track active downloads: model_name -> progress info
         self.active_downloads: Dict[str, Dict[str, Any]] = {}
+        # Last successful health check: (monotonic timestamp, result)
+        self._health_cache: Optional[tuple[float, bool]] = None
     
     async def get_client(self) -> AsyncClient:
         """Get or create async HTTP client."""
@@ -70,14 +83,23 @@ class OllamaService:
     async def check_health(self) -> bool:
         """
         Check if Ollama service is running and accessible.
+        Healthy results are cached briefly so burst polling does not hit
+        Ollama on every call; failures are never cached so recovery is
+        detected on the next probe.
         
         Returns:
             bool: True if Ollama is accessible, False otherwise
         """
+        cached = self._health_cache
+        if cached is not None and time.monotonic() - cached[0] < HEALTH_CACHE_TTL_SECONDS:
+            return cached[1]
+        
         try:
             client = await self.get_client()
             response = await client.get(f"{self.settings.ollama_base_url}/api/tags")
-            return response.status_code == 200
+            is_healthy = response.status_code == 200
+            self._health_cache = (time.monotonic(), True) if is_healthy else None
+            return is_healthy
         except (ConnectError, TimeoutException) as e:
             logger.warning("ollama_health_check_failed", error=str(e))
             return False
@@ -255,6 +277,7 @@ class OllamaService:
         Args:
             model_name: Name of the model to download
         """
+        log = logger.bind(model=model_name)
         try:
             # Use Ollama CLI to pull the model
             process = await asyncio.create_subprocess_exec(
@@ -272,13 +295,13 @@ class OllamaService:
                     if line_str:
                         # Parse progress from output
                         self._update_download_progress(model_name, line_str)
-                        logger.debug("download_progress", model=model_name, line=line_str)
+                        log.debug("download_progress", line=line_str)
             
             # Wait for process to complete
             await process.wait()
             
             if process.returncode == 0:
-                logger.info("model_download_completed", model=model_name)
+                log.info("model_download_completed")
                 self.active_downloads[model_name] = {
                     "status": "completed",
                     "progress": 100,
@@ -292,11 +315,7 @@ class OllamaService:
                     stderr_output = stderr_output.decode()
                 
                 error_msg = stderr_output if stderr_output else "Unknown error"
-                logger.error(
-                    "model_download_failed",
-                    model=model_name,
-                    error=error_msg
-                )
+                log.error("model_download_failed", error=error_msg)
                 self.active_downloads[model_name] = {
                     "status": "failed",
                     "progress": 0,
@@ -305,7 +324,7 @@ class OllamaService:
                 }
                 
         except Exception as e:
-            logger.error("model_download_error", model=model_name, error=str(e))
+            log.error("model_download_error", error=str(e))
             self.active_downloads[model_name] = {
                 "status": "failed",
                 "progress": 0,
@@ -368,8 +387,9 @@ class OllamaService:
         Returns:
             Dictionary with status information
         """
+        log = logger.bind(model=model_name)
         try:
-            logger.info("model_deletion_started", model=model_name)
+            log.info("model_deletion_started")
             
             # Use Ollama CLI to remove the model
             process = await asyncio.create_subprocess_exec(
@@ -383,7 +403,7 @@ class OllamaService:
             stdout, stderr = await process.communicate()
             
             if process.returncode == 0:
-                logger.info("model_deletion_completed", model=model_name)
+                log.info("model_deletion_completed")
                 return {
                     "status": "success",
                     "model_name": model_name,
@@ -391,11 +411,7 @@ class OllamaService:
                 }
             else:
                 error_msg = stderr.decode() if stderr else "Unknown error"
-                logger.error(
-                    "model_deletion_failed",
-                    model=model_name,
-                    error=error_msg
-                )
+                log.error("model_deletion_failed", error=error_msg)
                 
                 if "not found" in error_msg.lower():
                     raise ModelNotFoundError(f"Model '{model_name}' not found")
@@ -403,35 +419,22 @@ class OllamaService:
                 raise OllamaServiceError(f"Failed to delete model: {error_msg}")
                 
         except FileNotFoundError:
-            logger.error("ollama_cli_not_found")
+            log.error("ollama_cli_not_found")
             raise OllamaServiceError(
                 "Ollama CLI not found. Please ensure Ollama is installed."
             )
         except Exception as e:
-            logger.error("model_deletion_error", model=model_name, error=str(e))
+            log.error("model_deletion_error", error=str(e))
             raise OllamaServiceError(f"Model deletion failed: {str(e)}")
 
 
-# Global service instance
-_ollama_service: Optional[OllamaService] = None
-
-
-def get_ollama_service() -> OllamaService:
+def get_ollama_service(request: Request) -> OllamaService:
     """
-    Get or create the global Ollama service instance.
+    Get the application-wide Ollama service instance.
+    Intended for use as a FastAPI dependency; the instance is created
+    in the application lifespan and stored on ``app.state``.
     
     Returns:
         OllamaService instance
     """
-    global _ollama_service
-    if _ollama_service is None:
-        _ollama_service = OllamaService()
-    return _ollama_service
-
-
-async def cleanup_ollama_service():
-    """Cleanup the global Ollama service instance."""
-    global _ollama_service
-    if _ollama_service:
-        await _ollama_service.close()
-        _ollama_service = None
+    return request.app.state.ollama
@@ -3,33 +3,136 @@ Service for generating training data from PDF documents.
 Creates LoRA-compatible JSONL files for model fine-tuning.
 """
 import json
+import re
+import time
 import uuid
 import asyncio
+import hashlib
+import itertools
+import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import aiofiles
+import httpx
+import numpy as np
+import orjson
+
+try:
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 from core.doc_extractor import DocumentExtractor
-from core.text_chunker import SemanticChunker
+from core.text_chunker import get_chunker
+from core.embedder import get_embedder
 from services.ollama_service import OllamaService
 from schemas.request_schemas import GenerateRequest
+from utils.config import get_settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Job metadata retention: oldest entries are evicted past either limit
+_MAX_TRACKED_JOBS = 10_000
+_JOB_TTL = timedelta(days=1)
+# Only jobs in these states may be evicted; active jobs are always kept
+_FINISHED_JOB_STATUSES = frozenset({"completed", "failed"})
+
+# PDFs larger than this are spooled to a temporary file that the extractor
+# converts in place, so the uploaded bytes can be freed during the job
+_SPOOL_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+# Chunks below these thresholds are mostly OCR noise or layout debris
+_MIN_CHUNK_WORDS = 20
+_MIN_ALPHA_RATIO = 0.6
+# Runs of non-letter characters; stripping them leaves only letters
+_NON_ALPHA_RE = re.compile(r"[\W\d_]+")
+
+# Chunks are embedded and deduplicated this many at a time
+_DEDUP_BLOCK_SIZE = 256
+
+# Per-chunk Q&A prompt, split around the chunk text
+_PROMPT_PREFIX = """You are an expert at creating training data for language models. 
+Given a piece of text, create a natural question that can be answered using that text, 
+and provide the answer. The question should be specific and the answer should be informative.
+
+Format your response as:
+QUESTION: [your question here]
+ANSWER: [your answer here]
+
+Only generate ONE question-answer pair.
+
+Based on this text, create ONE question-answer pair:
+
+Text: """
+_PROMPT_SUFFIX = """
+
+Generate the question and answer now:"""
+
+# Parses a single QUESTION/ANSWER pair from a per-chunk generation
+_QA_RE = re.compile(r"QUESTION:\s*(.+?)\s*\nANSWER:\s*(.+)", re.DOTALL | re.IGNORECASE)
+
+# Parses numbered QUESTION_i/ANSWER_i pairs from a batched generation
+_BATCH_QA_RE = re.compile(
+    r"QUESTION_(\d+):\s*(.*?)\nANSWER_\1:\s*(.*?)(?=\nQUESTION_|\Z)",
+    re.S
+)
+
 
 class TrainingDataService:
     """Service for creating training datasets from PDFs."""
     
-    def __init__(self):
-        """Initialize training data service."""
+    def __init__(
+        self,
+        num_parallel: int = 4,
+        batch_size: int = 8,
+        dedup_threshold: float = 0.95
+    ):
+        """
+        Initialize training data service.
+        
+        Args:
+            num_parallel: Maximum number of concurrent generation requests
+                sent to Ollama; should match the server's OLLAMA_NUM_PARALLEL
+            batch_size: Number of chunks sent to Ollama in a single prompt
+            dedup_threshold: Cosine similarity above which a chunk is treated
+                as a near-duplicate of an earlier one and skipped
+        """
+        self.num_parallel = num_parallel
+        self.batch_size = batch_size
+        self.dedup_threshold = dedup_threshold
         self.output_dir = Path("data/training_data")
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.ollama_service = OllamaService()
-        self.processing_jobs: Dict[str, Dict[str, Any]] = {}
+        self.cache_db_path = self.output_dir / "sample_cache.db"
+        self._init_sample_cache()
+        # Dedicated keep-alive pool shared by all chunk/batch generation calls
+        self.ollama_service = OllamaService(
+            client=httpx.AsyncClient(
+                timeout=httpx.Timeout(get_settings().ollama_timeout),
+                limits=httpx.Limits(
+                    max_connections=64,
+                    max_keepalive_connections=64
+                )
+            )
+        )
+        self.processing_jobs: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         self.doc_extractor = DocumentExtractor()
-        self.text_chunker = SemanticChunker()
+        # Extraction, chunking and embedding are blocking; run them off the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count(),
+            thread_name_prefix="training_data"
+        )
         
     async def process_pdf_to_jsonl(
         self,
@@ -38,7 +141,8 @@ class TrainingDataService:
         model: str = "llama2",
         max_samples: Optional[int] = None,
         chunk_size: int = 500,
-        chunk_overlap: int = 50
+        chunk_overlap: int = 50,
+        output_format: str = "jsonl"
     ) -> Dict[str, Any]:
         """
         Process a PDF and generate training data in JSONL format.
@@ -50,6 +154,8 @@ class TrainingDataService:
             max_samples: Maximum number of training samples to generate
             chunk_size: Size of text chunks
             chunk_overlap: Overlap between chunks
+            output_format: "jsonl", or "parquet" to also write a
+                zstd-compressed Parquet copy alongside the JSONL file
             
         Returns:
             Job information including job_id
@@ -65,14 +171,16 @@ class TrainingDataService:
             "model": model,
             "total_samples": 0,
             "output_path": None,
+            "parquet_path": None,
         }
         
-        self.processing_jobs[job_id] = job_info
+        self._register_job(job_id, job_info)
         
         # Start processing in background
         asyncio.create_task(
             self._process_pdf_task(
-                job_id, pdf_content, filename, model, max_samples, chunk_size, chunk_overlap
+                job_id, pdf_content, filename, model, max_samples, chunk_size, chunk_overlap,
+                output_format
             )
         )
         
@@ -93,10 +201,14 @@ class TrainingDataService:
         model: str,
         max_samples: Optional[int],
         chunk_size: int,
-        chunk_overlap: int
+        chunk_overlap: int,
+        output_format: str
     ):
         """Execute PDF processing task."""
         job = self.processing_jobs[job_id]
+        loop = asyncio.get_running_loop()
+        file_obj = None
+        spool_path: Optional[str] = None
         
         try:
             job["status"] = "running"
@@ -104,8 +216,26 @@ class TrainingDataService:
             
             # Extract text from PDF
             logger.info("extracting_text_from_pdf", job_id=job_id, filename=filename)
-            file_obj = io.BytesIO(pdf_content)
-            extracted_doc = self.doc_extractor.extract(file_obj, filename)
+            if len(pdf_content) > _SPOOL_THRESHOLD_BYTES:
+                spool_path = await loop.run_in_executor(
+                    self._executor,
+                    self._spool_to_file,
+                    pdf_content
+                )
+                # Release the in-memory copy; the content now lives in the temp file
+                del pdf_content
+                file_obj = open(spool_path, "rb")
+            else:
+                file_obj = io.BytesIO(pdf_content)
+            extracted_doc = await loop.run_in_executor(
+                self._executor,
+                partial(
+                    self.doc_extractor.extract,
+                    file_obj,
+                    filename,
+                    source_path=spool_path
+                )
+            )
             text = extracted_doc.text
             
             if not text or len(text.strip()) < 100:
@@ -115,13 +245,34 @@ class TrainingDataService:
             
             # Chunk the text
             logger.info("chunking_text", job_id=job_id, text_length=len(text))
-            chunker = SemanticChunker(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap
+            chunker = get_chunker(chunk_size, chunk_overlap)
+            chunk_objects = await loop.run_in_executor(
+                self._executor,
+                chunker.chunk_text,
+                text
             )
-            chunk_objects = chunker.chunk_text(text)
             chunks = [chunk.text for chunk in chunk_objects]
             
+            # Skip near-empty or non-textual chunks before any LLM dispatch
+            usable_chunks = [chunk for chunk in chunks if self._is_usable_chunk(chunk)]
+            if len(usable_chunks) < len(chunks):
+                logger.info(
+                    "low_quality_chunks_filtered",
+                    job_id=job_id,
+                    filtered=len(chunks) - len(usable_chunks),
+                    remaining=len(usable_chunks)
+                )
+            chunks = usable_chunks
+            
+            # Drop near-duplicate chunks (e.g. from overlap) before paying for LLM calls
+            chunks = await loop.run_in_executor(
+                self._executor,
+                self._deduplicate_chunks,
+                chunks,
+                job_id,
+                max_samples
+            )
+            
             job["progress"] = 30.0
             
             # Limit chunks if max_samples is specified
@@ -135,51 +286,88 @@ class TrainingDataService:
                 model=model
             )
             
-            # Generate training samples
-            training_samples = []
-            progress_step = 60.0 / len(chunks) if chunks else 0
+            # Samples are streamed to the JSONL file as each batch finishes
+            output_filename = f"{Path(filename).stem}_{job_id[:8]}_training_data.jsonl"
+            output_path = self.output_dir / output_filename
             
-            for i, chunk in enumerate(chunks):
-                try:
-                    # Generate Q&A pairs from the chunk
-                    sample = await self._generate_training_sample(chunk, model)
-                    if sample:
-                        training_samples.append(sample)
-                    
-                    job["progress"] = 30.0 + (i + 1) * progress_step
+            # Validate the static generation settings once per job; the prompt
+            # placeholder is replaced for every chunk or batch
+            request_template = GenerateRequest(
+                model=model,
+                prompt=_PROMPT_PREFIX,
+                temperature=0.7,
+                max_tokens=500
+            )
+            
+            # Generate training samples in batches of chunks, running up to
+            # num_parallel batches concurrently
+            semaphore = asyncio.Semaphore(self.num_parallel)
+            total_samples = 0
+            windows = [
+                chunks[start:start + self.batch_size]
+                for start in range(0, len(chunks), self.batch_size)
+            ]
+            total_windows = len(windows)
+            batches_done = itertools.count(1)
+            
+            async with aiofiles.open(output_path, "wb", buffering=1 << 20) as output_file:
+                
+                async def generate_bounded(window: List[str]) -> None:
+                    nonlocal total_samples
+                    async with semaphore:
+                        try:
+                            samples = await self._generate_training_samples_batch(
+                                window,
+                                request_template
+                            )
+                        finally:
+                            job["progress"] = 30.0 + 60.0 * next(batches_done) / total_windows
                     
-                except Exception as e:
+                    # One write per batch keeps each batch's lines contiguous
+                    if samples:
+                        await output_file.write(
+                            b"".join(orjson.dumps(sample) + b"\n" for sample in samples)
+                        )
+                    total_samples += len(samples)
+                
+                results = await asyncio.gather(
+                    *[generate_bounded(window) for window in windows],
+                    return_exceptions=True
+                )
+            
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
                     logger.warning(
                         "sample_generation_failed",
                         job_id=job_id,
-                        chunk_index=i,
-                        error=str(e)
+                        batch_index=i,
+                        error=str(result)
                     )
-                    continue
             
             job["progress"] = 90.0
             
-            if not training_samples:
+            if not total_samples:
+                output_path.unlink(missing_ok=True)
                 raise ValueError("Failed to generate any training samples from the PDF")
             
-            # Save as JSONL
-            output_filename = f"{Path(filename).stem}_{job_id[:8]}_training_data.jsonl"
-            output_path = self.output_dir / output_filename
-            
-            with open(output_path, "w", encoding="utf-8") as f:
-                for sample in training_samples:
-                    f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+            if output_format == "parquet":
+                parquet_path = await loop.run_in_executor(
+                    self._executor,
+                    self._write_parquet,
+                    output_path
+                )
+                job["parquet_path"] = str(parquet_path) if parquet_path else None
             
             job["status"] = "completed"
             job["progress"] = 100.0
-            job["total_samples"] = len(training_samples)
+            job["total_samples"] = total_samples
             job["output_path"] = str(output_path)
             job["completed_at"] = datetime.utcnow()
             
             logger.info(
                 "training_data_generation_completed",
                 job_id=job_id,
-                samples=len(training_samples),
+                samples=total_samples,
                 output_path=str(output_path)
             )
             
@@ -194,64 +382,81 @@ class TrainingDataService:
                 error=str(e),
                 exc_info=True
             )
+        finally:
+            if file_obj is not None:
+                file_obj.close()
+            if spool_path:
+                os.unlink(spool_path)
+    
+    @staticmethod
+    def _write_parquet(jsonl_path: Path) -> Optional[Path]:
+        """
+        Write a zstd-compressed Parquet copy of a JSONL training file.
+        
+        Args:
+            jsonl_path: Path to the generated JSONL file
+            
+        Returns:
+            Path to the Parquet file, or None if pyarrow is unavailable
+        """
+        if not PYARROW_AVAILABLE:
+            logger.warning("parquet_output_skipped", reason="pyarrow not installed")
+            return None
+        
+        parquet_path = jsonl_path.with_suffix(".parquet")
+        table = pa_json.read_json(jsonl_path)
+        pq.write_table(table, parquet_path, compression="zstd")
+        return parquet_path
+    
+    @staticmethod
+    def _spool_to_file(content: bytes) -> str:
+        """
+        Write content to a temporary file.
+        
+        Args:
+            content: Raw file bytes
+            
+        Returns:
+            Temporary file path; the caller removes the file
+        """
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(content)
+        return tmp.name
     
     async def _generate_training_sample(
         self,
         text_chunk: str,
-        model: str
+        request_template: GenerateRequest
     ) -> Optional[Dict[str, Any]]:
         """
         Generate a training sample from a text chunk.
         Creates instruction-response pairs suitable for LoRA training.
+        The caller is responsible for the sample cache.
         
         Args:
             text_chunk: Text to generate training data from
-            model: Ollama model to use
+            request_template: Job-wide generation settings; the prompt is
+                filled in per chunk
             
         Returns:
             Training sample in LoRA format
         """
         # Create comprehensive prompt with instructions
-        prompt = f"""You are an expert at creating training data for language models. 
-Given a piece of text, create a natural question that can be answered using that text, 
-and provide the answer. The question should be specific and the answer should be informative.
-
-Format your response as:
-QUESTION: [your question here]
-ANSWER: [your answer here]
-
-Only generate ONE question-answer pair.
-
-Based on this text, create ONE question-answer pair:
-
-Text: {text_chunk}
-
-Generate the question and answer now:"""
+        prompt = _PROMPT_PREFIX + text_chunk + _PROMPT_SUFFIX
 
         try:
             # Generate Q&A using Ollama
-            request = GenerateRequest(
-                model=model,
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=500
-            )
+            request = request_template.model_copy(update={"prompt": prompt})
             
             response = await self.ollama_service.generate(request)
             
             response_text = response.get("response", "").strip()
             
             # Parse the response
-            question = None
-            answer = None
-            
-            lines = response_text.split("\n")
-            for line in lines:
-                line = line.strip()
-                if line.startswith("QUESTION:"):
-                    question = line.replace("QUESTION:", "").strip()
-                elif line.startswith("ANSWER:"):
-                    answer = line.replace("ANSWER:", "").strip()
+            match = _QA_RE.search(response_text)
+            question, answer = (
+                (match.group(1).strip(), match.group(2).strip()) if match else (None, None)
+            )
             
             # If parsing failed, try alternative approach
             if not question or not answer:
@@ -262,22 +467,311 @@ Generate the question and answer now:"""
                         question = parts[0].strip() + "?"
                         answer = parts[1].strip()
             
-            if question and answer and len(answer) > 20:
-                # Return in LoRA training format
-                # Format 1: Instruction-Response format
-                return {
-                    "instruction": question,
-                    "input": "",
-                    "output": answer,
-                    "text": f"### Instruction:\n{question}\n\n### Response:\n{answer}"
-                }
-            
-            return None
+            return self._build_sample(question, answer)
             
         except Exception as e:
             logger.warning("qa_generation_failed", error=str(e))
             return None
     
+    async def _generate_training_samples_batch(
+        self,
+        chunks: List[str],
+        request_template: GenerateRequest
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate training samples for several chunks with a single prompt.
+        Cached chunks are skipped, and chunks whose Q&A pair cannot be
+        parsed from the batched response are retried individually.
+        
+        Args:
+            chunks: Texts to generate training data from
+            request_template: Job-wide generation settings; the prompt and
+                token budget are filled in per batch
+            
+        Returns:
+            List of training samples in LoRA format
+        """
+        model = request_template.model
+        loop = asyncio.get_running_loop()
+        # sqlite access blocks, so it runs on the worker pool
+        parsed = await loop.run_in_executor(
+            self._executor, self._get_cached_samples, chunks, model
+        )
+        
+        pending = [i for i in range(len(chunks)) if i not in parsed]
+        
+        if len(pending) > 1:
+            numbered_chunks = "\n\n".join(
+                f"### CHUNK {n}\n{chunks[i]}" for n, i in enumerate(pending, start=1)
+            )
+            prompt = f"""You are an expert at creating training data for language models. 
+You are given {len(pending)} numbered pieces of text. For EACH piece, create a natural 
+question that can be answered using that text, and provide the answer. The questions 
+should be specific and the answers should be informative.
+
+Format your response exactly as:
+QUESTION_1: [question for chunk 1]
+ANSWER_1: [answer for chunk 1]
+QUESTION_2: [question for chunk 2]
+ANSWER_2: [answer for chunk 2]
+
+Generate exactly ONE question-answer pair per chunk.
+
+{numbered_chunks}
+
+Generate the questions and answers now:"""
+            
+            try:
+                request = request_template.model_copy(update={
+                    "prompt": prompt,
+                    "max_tokens": request_template.max_tokens * len(pending)
+                })
+                
+                response = await self.ollama_service.generate(request)
+                response_text = response.get("response", "").strip()
+                
+                for match in _BATCH_QA_RE.finditer(response_text):
+                    position = int(match.group(1)) - 1
+                    if not 0 <= position < len(pending):
+                        continue
+                    index = pending[position]
+                    if index in parsed:
+                        continue
+                    sample = self._build_sample(
+                        match.group(2).strip(),
+                        match.group(3).strip()
+                    )
+                    if sample:
+                        parsed[index] = sample
+                        
+            except Exception as e:
+                logger.warning("batch_qa_generation_failed", error=str(e))
+        
+        # Fall back to per-chunk generation for anything the batch missed
+        missing = [i for i in pending if i not in parsed]
+        if missing:
+            logger.debug(
+                "batch_qa_fallback",
+                batch_size=len(chunks),
+                missing=len(missing)
+            )
+            # Sequential, so the batch keeps holding a single num_parallel slot
+            # instead of fanning out extra requests to a struggling server
+            for i in missing:
+                sample = await self._generate_training_sample(chunks[i], request_template)
+                if sample:
+                    parsed[i] = sample
+        
+        # Cache everything generated for this window in a single transaction
+        generated = [(chunks[i], parsed[i]) for i in pending if i in parsed]
+        if generated:
+            await loop.run_in_executor(
+                self._executor, self._cache_samples, generated, model
+            )
+        
+        return [parsed[i] for i in sorted(parsed)]
+    
+    @staticmethod
+    def _build_sample(
+        question: Optional[str],
+        answer: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Build a LoRA training sample, rejecting empty or too-short answers."""
+        if question and answer and len(answer) > 20:
+            # Return in LoRA training format
+            # Format 1: Instruction-Response format
+            return {
+                "instruction": question,
+                "input": "",
+                "output": answer,
+                "text": f"### Instruction:\n{question}\n\n### Response:\n{answer}"
+            }
+        
+        return None
+    
+    @staticmethod
+    def _is_usable_chunk(chunk: str) -> bool:
+        """Reject chunks that are too short or mostly non-alphabetic."""
+        if len(chunk.split()) < _MIN_CHUNK_WORDS:
+            return False
+        alpha_count = len(_NON_ALPHA_RE.sub("", chunk))
+        return alpha_count / len(chunk) >= _MIN_ALPHA_RATIO
+    
+    def _deduplicate_chunks(
+        self,
+        chunks: List[str],
+        job_id: str,
+        limit: Optional[int] = None
+    ) -> List[str]:
+        """
+        Remove chunks that are semantically near-identical to an earlier chunk.
+        Order is preserved; the first occurrence of each near-duplicate group
+        is kept.
+        
+        Chunks are embedded block by block and compared only against the
+        chunks kept so far, so no full pairwise similarity matrix is built.
+        
+        Args:
+            chunks: Chunk texts in document order
+            job_id: Job identifier for logging
+            limit: Stop once this many unique chunks are kept
+            
+        Returns:
+            Deduplicated list of chunk texts
+        """
+        if len(chunks) < 2:
+            return chunks[:limit] if limit else chunks
+        
+        embedder = get_embedder()
+        deduplicated: List[str] = []
+        kept_embeddings: Optional[np.ndarray] = None
+        scanned = 0
+        
+        for start in range(0, len(chunks), _DEDUP_BLOCK_SIZE):
+            if limit and len(deduplicated) >= limit:
+                break
+            block = chunks[start:start + _DEDUP_BLOCK_SIZE]
+            try:
+                embeddings = embedder.embed_documents(block, show_progress=False)
+            except Exception as e:
+                logger.warning("chunk_dedup_skipped", job_id=job_id, error=str(e))
+                return deduplicated + chunks[start:]
+            
+            if kept_embeddings is None:
+                kept_embeddings = np.empty(
+                    (limit or len(chunks), embeddings.shape[1]),
+                    dtype=embeddings.dtype
+                )
+            
+            for chunk, embedding in zip(block, embeddings):
+                scanned += 1
+                # Embeddings are L2-normalized, so the dot product is cosine similarity
+                kept = kept_embeddings[:len(deduplicated)]
+                if np.any(kept @ embedding > self.dedup_threshold):
+                    continue
+                kept_embeddings[len(deduplicated)] = embedding
+                deduplicated.append(chunk)
+                if limit and len(deduplicated) >= limit:
+                    break
+        
+        if len(deduplicated) < scanned:
+            logger.info(
+                "near_duplicate_chunks_removed",
+                job_id=job_id,
+                removed=scanned - len(deduplicated),
+                remaining=len(deduplicated)
+            )
+        return deduplicated
+    
+    def _init_sample_cache(self):
+        """Create the generated-sample cache table if it does not exist."""
+        with sqlite3.connect(self.cache_db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sample_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    sample TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sample_cache_created_at "
+                "ON sample_cache(created_at)"
+            )
+    
+    @staticmethod
+    def _sample_cache_key(text_chunk: str, model: str) -> str:
+        """Content hash identifying a (model, chunk) generation."""
+        return hashlib.sha256(f"{model}\x00{text_chunk}".encode("utf-8")).hexdigest()
+    
+    def _get_cached_samples(self, chunks: List[str], model: str) -> Dict[int, Dict[str, Any]]:
+        """Return previously generated samples for these chunks, keyed by chunk index."""
+        if not chunks:
+            return {}
+        
+        keys = [self._sample_cache_key(chunk, model) for chunk in chunks]
+        try:
+            with sqlite3.connect(self.cache_db_path) as conn:
+                rows = conn.execute(
+                    "SELECT key, sample FROM sample_cache WHERE key IN "
+                    f"({', '.join('?' * len(keys))})",
+                    keys
+                ).fetchall()
+        except Exception as e:
+            logger.warning("sample_cache_read_failed", error=str(e))
+            return {}
+        
+        found = dict(rows)
+        return {i: json.loads(found[key]) for i, key in enumerate(keys) if key in found}
+    
+    def _cache_samples(self, entries: List[tuple], model: str):
+        """Store (chunk, sample) pairs keyed by chunk content hash in one transaction."""
+        created_at = time.time()
+        try:
+            with sqlite3.connect(self.cache_db_path) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sample_cache (key, model, sample, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            self._sample_cache_key(chunk, model),
+                            model,
+                            json.dumps(sample, ensure_ascii=False),
+                            created_at
+                        )
+                        for chunk, sample in entries
+                    ]
+                )
+        except Exception as e:
+            logger.warning("sample_cache_write_failed", error=str(e))
+    
+    def prune_cache(self, ttl_seconds: float) -> int:
+        """
+        Remove cached samples older than the given age.
+        
+        Args:
+            ttl_seconds: Maximum age of cache entries to keep
+            
+        Returns:
+            Number of entries removed
+        """
+        with sqlite3.connect(self.cache_db_path) as conn:
+            cursor = conn.execute(
+                "DELETE FROM sample_cache WHERE created_at < ?",
+                (time.time() - ttl_seconds,)
+            )
+            removed = cursor.rowcount
+        
+        logger.info("sample_cache_pruned", removed=removed, ttl_seconds=ttl_seconds)
+        return removed
+    
+    async def close(self):
+        """Release the HTTP client and worker threads."""
+        await self.ollama_service.close()
+        self._executor.shutdown(wait=False)
+    
+    def _register_job(self, job_id: str, job_info: Dict[str, Any]):
+        """
+        Track a new job, evicting the oldest finished jobs past the size or
+        age limit. Queued and running jobs are never evicted.
+        """
+        self.processing_jobs[job_id] = job_info
+        self.processing_jobs.move_to_end(job_id)
+        
+        cutoff = datetime.utcnow() - _JOB_TTL
+        excess = len(self.processing_jobs) - _MAX_TRACKED_JOBS
+        evictable = []
+        for tracked_id, job in self.processing_jobs.items():
+            # Jobs are in creation order, so nothing newer needs evicting
+            if excess <= 0 and job["created_at"] >= cutoff:
+                break
+            if job["status"] in _FINISHED_JOB_STATUSES:
+                evictable.append(tracked_id)
+                excess -= 1
+        
+        for tracked_id in evictable:
+            del self.processing_jobs[tracked_id]
+    
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a processing job."""
         return self.processing_jobs.get(job_id)
@@ -296,11 +790,22 @@ Generate the question and answer now:"""
 
 # Singleton instance
 _training_data_service: Optional[TrainingDataService] = None
+_service_lock = threading.Lock()
 
 
 def get_training_data_service() -> TrainingDataService:
     """Get the training data service instance."""
     global _training_data_service
     if _training_data_service is None:
-        _training_data_service = TrainingDataService()
+        with _service_lock:
+            if _training_data_service is None:
+                _training_data_service = TrainingDataService()
     return _training_data_service
+
+
+async def cleanup_training_data_service():
+    """Cleanup the training data service instance."""
+    global _training_data_service
+    if _training_data_service:
+        await _training_data_service.close()
+        _training_data_service = None
@@ -3,12 +3,21 @@ Model training service.
 Handles fine-tuning of models using different techniques (LoRA, Adapters, BitFit).
 """
 import os
-import json
+import re
+import logging
+import importlib.util
 import asyncio
+import hashlib
+import math
+import shutil
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from pathlib import Path
+import orjson
 import torch
 from transformers import (
     AutoModelForCausalLM,
@@ -17,13 +26,21 @@ from transformers import (
     Trainer,
     DataCollatorForLanguageModeling,
 )
-from datasets import load_dataset, Dataset, load_from_disk
+from datasets import (
+    load_dataset,
+    load_dataset_builder,
+    Dataset,
+    DatasetDict,
+    IterableDataset,
+    load_from_disk,
+)
 from peft import (
     LoraConfig,
     get_peft_model,
     PeftModel,
     TaskType,
     PrefixTuningConfig,
+    prepare_model_for_kbit_training,
     # Note: AdapterConfig removed in newer PEFT versions
 )
 
@@ -40,18 +57,102 @@ from schemas.training_schemas import (
 
 logger = get_logger(__name__)
 
+# FlashAttention-2 kernels are optional; SDPA is used when they are missing
+FLASH_ATTN_AVAILABLE = importlib.util.find_spec("flash_attn") is not None
+
+# Pre-tokenization settings for datasets.map
+_TOKENIZE_BATCH_SIZE = 2000
+_TOKENIZE_NUM_PROC = max(1, (os.cpu_count() or 1) // 2)
+
+# Datasets larger than this are streamed instead of materialised and cached
+_STREAMING_THRESHOLD_BYTES = 1024 * 1024 * 1024
+
+# Number of base-model tokenizers kept loaded between jobs
+_TOKENIZER_CACHE_SIZE = 2
+
+# Oldest finished jobs are dropped once more than this many are tracked
+_MAX_TRACKED_JOBS = 1000
+
+# Only jobs in these states may be evicted from the job store
+_TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+
+@dataclass(slots=True)
+class TrainingJob:
+    """In-memory state of a training job."""
+    job_id: str
+    model_name: str
+    base_model: str
+    technique: str
+    request: Dict[str, Any]
+    created_at: datetime
+    status: str = "queued"
+    progress: float = 0.0
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    model_path: Optional[str] = None
+    error_message: Optional[str] = None
+    current_epoch: Optional[int] = None
+    current_step: Optional[int] = None
+    total_steps: Optional[int] = None
+    loss: Optional[float] = None
+    learning_rate: Optional[float] = None
+
 
 class TrainingService:
     """Service for managing model training jobs."""
     
     def __init__(self):
         """Initialize training service."""
-        self.jobs: Dict[str, Dict[str, Any]] = {}
+        # Jobs in creation order; finished jobs beyond _MAX_TRACKED_JOBS are evicted
+        self.jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
         self.models_dir = Path("models/trained")
         self.models_dir.mkdir(parents=True, exist_ok=True)
         self.checkpoints_dir = Path("models/checkpoints")
         self.checkpoints_dir.mkdir(parents=True, exist_ok=True)
+        # Tokenized datasets shared across jobs, keyed by data and tokenizer
+        self.tokenized_cache_dir = Path("models/cache/tokenized")
+        
+        if torch.cuda.is_available():
+            # TF32 matmuls on Ampere+ and fused SDPA kernels
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.backends.cudnn.benchmark = True
+            torch.backends.cuda.enable_flash_sdp(True)
+            torch.backends.cuda.enable_mem_efficient_sdp(True)
+        
+        # LRU of loaded tokenizers keyed by base model
+        self._tokenizer_cache: "OrderedDict[str, Any]" = OrderedDict()
+        # Training blocks for its whole duration, so it runs off the event loop;
+        # a single worker serialises jobs onto the GPU
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training")
+        # Executor futures of jobs that are still queued or running
+        self._job_futures: Dict[str, asyncio.Future] = {}
+        
+    def _get_tokenizer(self, base_model: str):
+        """
+        Get a tokenizer for the base model, reusing a cached instance.
+        
+        Args:
+            base_model: HuggingFace model identifier or local path
+            
+        Returns:
+            Tokenizer with a pad token set
+        """
+        tokenizer = self._tokenizer_cache.get(base_model)
+        if tokenizer is not None:
+            self._tokenizer_cache.move_to_end(base_model)
+            return tokenizer
         
+        tokenizer = AutoTokenizer.from_pretrained(base_model, use_fast=True)
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        
+        self._tokenizer_cache[base_model] = tokenizer
+        if len(self._tokenizer_cache) > _TOKENIZER_CACHE_SIZE:
+            self._tokenizer_cache.popitem(last=False)
+        return tokenizer
+    
     async def start_training(self, request: TrainingRequest) -> Dict[str, Any]:
         """
         Start a new training job.
@@ -64,21 +165,21 @@ class TrainingService:
         """
         job_id = str(uuid.uuid4())
         
-        job_info = {
-            "job_id": job_id,
-            "model_name": request.new_model_name,
-            "base_model": request.base_model,
-            "technique": request.technique,
-            "status": "queued",
-            "progress": 0.0,
-            "created_at": datetime.utcnow(),
-            "request": request.dict(),
-        }
-        
-        self.jobs[job_id] = job_info
+        self.jobs[job_id] = TrainingJob(
+            job_id=job_id,
+            model_name=request.new_model_name,
+            base_model=request.base_model,
+            technique=request.technique,
+            request=request.dict(),
+            created_at=datetime.utcnow(),
+        )
+        self._evict_finished_jobs()
         
-        # Start training in background
-        asyncio.create_task(self._run_training(job_id))
+        # Start training in background; the future is tracked until the job
+        # leaves the executor so it is never evicted while queued or running
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._run_training, job_id)
+        self._job_futures[job_id] = future
+        future.add_done_callback(lambda _: self._job_futures.pop(job_id, None))
         
         logger.info(
             "training_job_created",
@@ -94,19 +195,43 @@ class TrainingService:
             "model_name": request.new_model_name,
         }
     
-    async def _run_training(self, job_id: str):
+    def _evict_finished_jobs(self):
+        """
+        Drop the oldest finished jobs until the store is within _MAX_TRACKED_JOBS.
+        Jobs still queued on or running in the executor are never evicted (even
+        if already cancelled), so the store may exceed the limit while they are
+        all still active.
+        """
+        excess = len(self.jobs) - _MAX_TRACKED_JOBS
+        if excess <= 0:
+            return
+        
+        evictable = [
+            job_id for job_id, job in self.jobs.items()
+            if job.status in _TERMINAL_STATUSES and job_id not in self._job_futures
+        ][:excess]
+        for job_id in evictable:
+            del self.jobs[job_id]
+    
+    def _run_training(self, job_id: str):
         """
         Execute the training job.
+        Runs synchronously on the training executor thread.
         
         Args:
             job_id: Job identifier
         """
-        job = self.jobs[job_id]
-        request = TrainingRequest(**job["request"])
+        job = self.jobs.get(job_id)
+        if job is None or job.status == "cancelled":
+            # Cancelled while waiting in the executor queue
+            logger.info("training_skipped_cancelled", job_id=job_id)
+            return
+        
+        request = TrainingRequest(**job.request)
         
         try:
-            job["status"] = "running"
-            job["started_at"] = datetime.utcnow()
+            job.status = "running"
+            job.started_at = datetime.utcnow()
             
             logger.info("training_started", job_id=job_id, base_model=request.base_model)
             
@@ -120,14 +245,22 @@ class TrainingService:
             
             # Load tokenizer and model
             logger.info("loading_tokenizer", base_model=request.base_model)
-            tokenizer = AutoTokenizer.from_pretrained(request.base_model)
-            if tokenizer.pad_token is None:
-                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer = self._get_tokenizer(request.base_model)
+            
+            # Under a distributed launcher (torchrun/accelerate) FSDP shards the
+            # model itself, so device_map placement must be left off
+            world_size = int(os.environ.get("WORLD_SIZE", "1"))
+            distributed = world_size > 1
             
             # Load base model with appropriate settings
             model_kwargs = {
-                "device_map": "auto" if torch.cuda.is_available() else None,
+                "device_map": "auto" if torch.cuda.is_available() and not distributed else None,
+                # Initialise on the meta device and stream weights straight to
+                # their target device instead of materialising a CPU copy first
+                "low_cpu_mem_usage": True,
             }
+            if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+                model_kwargs["torch_dtype"] = torch.bfloat16
             
             if request.technique in ["qlora"]:
                 # Check if GPU is available for QLoRA
@@ -148,12 +281,24 @@ class TrainingService:
                         "Install it with: pip install bitsandbytes"
                     )
                 
-                # Load in 4-bit for QLoRA
+                # Load in 4-bit for QLoRA; bf16 compute avoids fp16 loss-scaling
+                # overflow on NF4 weights where the GPU supports it
+                compute_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
                 model_kwargs["quantization_config"] = BitsAndBytesConfig(
                     load_in_4bit=True,
                     bnb_4bit_quant_type="nf4",
-                    bnb_4bit_compute_dtype=torch.float16,
+                    bnb_4bit_compute_dtype=compute_dtype,
                     bnb_4bit_use_double_quant=True,
+                    # Store packed NF4 weights as a float dtype so FSDP can shard them
+                    bnb_4bit_quant_storage=compute_dtype,
+                )
+                model_kwargs["torch_dtype"] = compute_dtype
+            
+            if torch.cuda.is_available():
+                # FlashAttention-2 needs half-precision weights; fall back to SDPA
+                half_precision = model_kwargs.get("torch_dtype") in (torch.float16, torch.bfloat16)
+                model_kwargs["attn_implementation"] = (
+                    "flash_attention_2" if FLASH_ATTN_AVAILABLE and half_precision else "sdpa"
                 )
             
             model = AutoModelForCausalLM.from_pretrained(
@@ -161,6 +306,31 @@ class TrainingService:
                 **model_kwargs
             )
             
+            # Fail before training rather than at save time if the saved
+            # model cannot fit on disk
+            final_model_path = self.models_dir / request.new_model_name
+            # QLoRA saves a merged bf16 model, ~4x the packed NF4 footprint
+            footprint = model.get_memory_footprint()
+            self._check_disk_space(
+                self.models_dir,
+                footprint * 4 if request.technique == "qlora" else footprint,
+            )
+            
+            # Check if GPU is available
+            has_cuda = torch.cuda.is_available()
+            
+            # FSDP handles activation checkpointing itself when sharding, so
+            # HF gradient checkpointing is only used without it
+            use_fsdp = distributed and has_cuda
+            use_grad_checkpointing = has_cuda and not use_fsdp
+            
+            if request.technique == "qlora":
+                # Casts norms to fp32, disables the KV cache and enables
+                # gradient checkpointing on the frozen 4-bit base
+                model = prepare_model_for_kbit_training(
+                    model, use_gradient_checkpointing=use_grad_checkpointing
+                )
+            
             # Apply technique-specific configuration
             if request.technique in ["lora", "qlora"]:
                 model = self._apply_lora(model, request.lora_config or LoRAConfigSchema())
@@ -177,13 +347,17 @@ class TrainingService:
                 )
             
             # Load and prepare dataset
-            dataset = await self._load_dataset(request.data_config, tokenizer, request.training_params.max_seq_length)
-            
-            # Setup training arguments
             output_dir = self.checkpoints_dir / job_id
+            streaming_examples = self._streaming_example_count(request.data_config)
+            dataset = self._load_dataset(
+                request.data_config,
+                tokenizer,
+                request.training_params.max_seq_length,
+                cache_dir=self.tokenized_cache_dir,
+                streaming=streaming_examples is not None,
+            )
             
-            # Check if GPU is available
-            has_cuda = torch.cuda.is_available()
+            # Setup training arguments
             
             # Adjust settings for CPU training
             if not has_cuda:
@@ -199,49 +373,120 @@ class TrainingService:
                 batch_size = request.training_params.batch_size
                 dataloader_num_workers = 4
             
+            # Prefer bf16 mixed precision on GPUs that support it; fp16 otherwise
+            use_bf16 = has_cuda and torch.cuda.is_bf16_supported()
+            use_fp16 = request.training_params.use_fp16 and has_cuda and not use_bf16
+            
+            # Streamed datasets have no length, so the Trainer needs an explicit step count
+            max_steps = -1
+            if streaming_examples is not None:
+                # Each optimizer step consumes one batch per process per accumulation step
+                examples_per_step = (
+                    batch_size * request.training_params.gradient_accumulation_steps * world_size
+                )
+                max_steps = math.ceil(streaming_examples / examples_per_step) * request.training_params.num_epochs
+            
+            # Compile the model graph on GPU; Triton kernels are unavailable on
+            # Windows and bitsandbytes 4-bit layers routinely break Dynamo tracing
+            use_compile = (
+                has_cuda
+                and hasattr(torch, "compile")
+                and os.name != "nt"
+                and request.technique != "qlora"
+            )
+            
+            # Dropping the ragged last batch keeps GPU batch shapes constant, but
+            # only when the dataset fills at least one global batch; otherwise the
+            # epoch would yield no batches and save an untrained model
+            drop_last = (
+                has_cuda
+                and streaming_examples is None
+                and len(dataset["train"]) >= batch_size * world_size
+            )
+            
             training_args = TrainingArguments(
                 output_dir=str(output_dir),
                 num_train_epochs=request.training_params.num_epochs,
+                max_steps=max_steps,
                 per_device_train_batch_size=batch_size,
                 gradient_accumulation_steps=request.training_params.gradient_accumulation_steps,
                 learning_rate=request.training_params.learning_rate,
                 warmup_steps=request.training_params.warmup_steps,
                 logging_steps=request.training_params.logging_steps,
                 save_steps=request.training_params.save_steps,
-                fp16=request.training_params.use_fp16 and has_cuda,
+                fp16=use_fp16,
+                bf16=use_bf16,
+                # Paged 8-bit AdamW keeps optimizer state small and absorbs memory spikes
+                optim="paged_adamw_8bit" if request.technique == "qlora" else "adamw_torch",
+                # Recompute activations in the backward pass to cut peak VRAM
+                gradient_checkpointing=use_grad_checkpointing,
+                gradient_checkpointing_kwargs={"use_reentrant": False} if use_grad_checkpointing else None,
+                # Batch similarly sized sequences together to minimise padding
+                group_by_length=True,
+                length_column_name="length",
+                # Fuse adapter and base kernels; default mode avoids CUDA graph
+                # re-capture for every dynamically padded batch shape
+                torch_compile=use_compile,
+                torch_compile_mode="default" if use_compile else None,
                 save_total_limit=3,
                 logging_dir=str(output_dir / "logs"),
                 report_to="none",  # Disable external reporting
                 dataloader_num_workers=dataloader_num_workers,
                 dataloader_pin_memory=has_cuda,  # Only use pinned memory with GPU
+                # Keep workers alive across epochs and queue batches ahead of the GPU
+                dataloader_prefetch_factor=4 if dataloader_num_workers > 0 else None,
+                dataloader_persistent_workers=dataloader_num_workers > 0,
+                dataloader_drop_last=drop_last,
                 use_cpu=not has_cuda,  # Explicitly use CPU if no GPU
+                # Shard parameters across GPUs when launched with multiple processes
+                fsdp="full_shard auto_wrap" if use_fsdp else "",
+                fsdp_config={"activation_checkpointing": True} if use_fsdp else None,
             )
             
             # Create trainer
             data_collator = DataCollatorForLanguageModeling(
                 tokenizer=tokenizer,
-                mlm=False
+                mlm=False,
+                pad_to_multiple_of=8,  # Keep padded shapes tensor-core aligned
             )
             
-            trainer = Trainer(
-                model=model,
-                args=training_args,
-                train_dataset=dataset["train"],
-                eval_dataset=dataset.get("validation"),
-                data_collator=data_collator,
-            )
+            def build_trainer(args: TrainingArguments) -> Trainer:
+                return Trainer(
+                    model=model,
+                    args=args,
+                    train_dataset=dataset["train"],
+                    eval_dataset=dataset.get("validation"),
+                    data_collator=data_collator,
+                )
+            
+            trainer = build_trainer(training_args)
             
             # Train the model
-            job["progress"] = 10.0
-            trainer.train()
-            job["progress"] = 90.0
+            job.progress = 10.0
+            try:
+                trainer.train()
+            except Exception as e:
+                # Compilation fails on the first forward pass, before any
+                # optimizer step, so retrying in eager mode starts clean
+                if not (use_compile and self._is_compile_error(e)):
+                    raise
+                logger.warning(
+                    "torch_compile_failed_falling_back_to_eager",
+                    job_id=job_id,
+                    error=str(e)
+                )
+                torch._dynamo.reset()
+                trainer = build_trainer(
+                    replace(training_args, torch_compile=False, torch_compile_mode=None)
+                )
+                trainer.train()
+            job.progress = 90.0
             
             # Save the final model
-            final_model_path = self.models_dir / request.new_model_name
             final_model_path.mkdir(parents=True, exist_ok=True)
             
-            model.save_pretrained(str(final_model_path))
-            tokenizer.save_pretrained(str(final_model_path))
+            self._save_model(model, request, final_model_path)
+            tokenizer.save_pretrained(final_model_path)
             
             # Save training metadata
             metadata = {
@@ -251,13 +496,14 @@ class TrainingService:
                 "training_config": request.dict(),
             }
             
-            with open(final_model_path / "training_metadata.json", "w") as f:
-                json.dump(metadata, f, indent=2)
+            (final_model_path / "training_metadata.json").write_bytes(
+                orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC)
+            )
             
-            job["status"] = "completed"
-            job["progress"] = 100.0
-            job["completed_at"] = datetime.utcnow()
-            job["model_path"] = str(final_model_path)
+            job.status = "completed"
+            job.progress = 100.0
+            job.completed_at = datetime.utcnow()
+            job.model_path = str(final_model_path)
             
             logger.info(
                 "training_completed",
@@ -266,7 +512,7 @@ class TrainingService:
             )
             
         except Exception as e:
-            job["status"] = "failed"
+            job.status = "failed"
             error_msg = str(e)
             
             # Provide helpful error messages
@@ -309,8 +555,8 @@ class TrainingService:
                     f"in the dataset configuration. Common column names: 'text', 'content', 'input', 'prompt'."
                 )
             
-            job["error_message"] = error_msg
-            job["completed_at"] = datetime.utcnow()
+            job.error_message = error_msg
+            job.completed_at = datetime.utcnow()
             
             logger.error(
                 "training_failed",
@@ -331,7 +577,10 @@ class TrainingService:
         )
         
         model = get_peft_model(model, peft_config)
-        model.print_trainable_parameters()
+        # Let gradients flow through the frozen base into the adapters when
+        # gradient checkpointing is on
+        model.enable_input_require_grads()
+        self._log_trainable_parameters(model)
         return model
     
     def _apply_adapter(self, model, config: AdapterConfigSchema, technique: str):
@@ -357,26 +606,106 @@ class TrainingService:
             )
         
         model = get_peft_model(model, peft_config)
-        model.print_trainable_parameters()
+        self._log_trainable_parameters(model)
         return model
     
+    def _save_model(self, model, request: TrainingRequest, path: Path):
+        """
+        Save the trained model, merging LoRA adapters into the base weights.
+        
+        A merged checkpoint serves with a single matmul per layer instead of
+        applying the adapter on every forward pass.
+        
+        Args:
+            model: Trained (possibly PEFT-wrapped) model
+            request: Training configuration
+            path: Output directory
+        """
+        if isinstance(model, PeftModel) and request.technique in ("lora", "adapter"):
+            model = model.merge_and_unload()
+        elif isinstance(model, PeftModel) and request.technique == "qlora":
+            # NF4 weights cannot absorb the adapter delta in place; keep the
+            # adapter and merge it into a bf16 copy of the base model
+            adapter_path = path / "adapter"
+            model.save_pretrained(adapter_path)
+            base = AutoModelForCausalLM.from_pretrained(
+                request.base_model,
+                torch_dtype=torch.bfloat16,
+                low_cpu_mem_usage=True,
+            )
+            model = PeftModel.from_pretrained(base, adapter_path).merge_and_unload()
+        
+        model.save_pretrained(path, safe_serialization=True, max_shard_size="5GB")
+    
+    def _check_disk_space(self, path: Path, required_bytes: int):
+        """
+        Ensure the filesystem holding ``path`` has room for the trained model.
+        
+        Args:
+            path: Directory the model will be written to
+            required_bytes: Estimated size of the saved model
+            
+        Raises:
+            OSError: If there is not enough free space
+        """
+        free = shutil.disk_usage(path).free
+        if free < required_bytes:
+            raise OSError(
+                f"Not enough disk space to save the trained model: "
+                f"{required_bytes / 1024**3:.1f} GB required, {free / 1024**3:.1f} GB free in {path}"
+            )
+    
+    @staticmethod
+    def _is_compile_error(error: BaseException) -> bool:
+        """
+        Check whether an exception (or one it wraps) came from torch.compile.
+        
+        Args:
+            error: Exception raised during training
+            
+        Returns:
+            True if a Dynamo or Inductor error is in the exception chain
+        """
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            if type(error).__module__.startswith(("torch._dynamo", "torch._inductor")):
+                return True
+            error = error.__cause__ or error.__context__
+        return False
+    
+    def _log_trainable_parameters(self, model):
+        """Log trainable parameter counts; the parameter walk only runs at debug level."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        trainable = 0
+        total = 0
+        for param in model.parameters():
+            numel = param.numel()
+            total += numel
+            if param.requires_grad:
+                trainable += numel
+        
+        logger.debug("trainable_params", trainable=trainable, total=total)
+    
     def _apply_bitfit(self, model, config: BitFitConfigSchema):
         """Apply BitFit - only train bias parameters."""
-        for name, param in model.named_parameters():
-            if "bias" not in name:
-                param.requires_grad = False
-            else:
-                param.requires_grad = True
-        
-        # Optionally include layer norm
+        # Bias terms, optionally with layer norm parameters, in a single pass
+        pattern = r"(^|\.)bias$"
         if config.include_layer_norm:
-            for name, param in model.named_parameters():
-                if "LayerNorm" in name or "layer_norm" in name:
-                    param.requires_grad = True
+            pattern += r"|LayerNorm|layer_norm"
+        trainable_re = re.compile(pattern)
+        
+        trainable = 0
+        total = 0
+        for name, param in model.named_parameters():
+            param.requires_grad = bool(trainable_re.search(name))
+            numel = param.numel()
+            total += numel
+            if param.requires_grad:
+                trainable += numel
         
-        # Count trainable parameters
-        trainable = sum(p.numel() for p in model.parameters() if p.requires_grad)
-        total = sum(p.numel() for p in model.parameters())
         logger.info(
             "bitfit_parameters",
             trainable=trainable,
@@ -386,8 +715,63 @@ class TrainingService:
         
         return model
     
-    async def _load_dataset(self, data_config, tokenizer, max_seq_length: int):
-        """Load and prepare dataset for training."""
+    def _streaming_example_count(self, data_config) -> Optional[int]:
+        """
+        Decide whether a dataset is large enough to stream.
+        
+        Args:
+            data_config: Training data configuration
+            
+        Returns:
+            Number of training examples if the dataset should be streamed,
+            otherwise None
+        """
+        max_samples = data_config.max_samples
+        if get_dataset_service().get_dataset_path(data_config.dataset_name):
+            return None
+        
+        try:
+            if data_config.dataset_name:
+                info = load_dataset_builder(data_config.dataset_name).info
+                if not info.dataset_size or info.dataset_size <= _STREAMING_THRESHOLD_BYTES:
+                    return None
+                train_split = (info.splits or {}).get("train")
+                num_examples = train_split.num_examples if train_split else None
+                if max_samples:
+                    # Only the first max_samples examples are pulled from the stream
+                    return min(num_examples, max_samples) if num_examples else max_samples
+                return num_examples
+            
+            if data_config.dataset_path and os.path.isfile(data_config.dataset_path):
+                if os.path.getsize(data_config.dataset_path) <= _STREAMING_THRESHOLD_BYTES:
+                    return None
+                # The text loader yields one example per line
+                lines = 0
+                with open(data_config.dataset_path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        lines += block.count(b"\n")
+                return min(lines, max_samples) if max_samples else lines
+        except Exception as e:
+            logger.warning("dataset_size_probe_failed", error=str(e))
+        
+        return None
+    
+    def _load_dataset(
+        self,
+        data_config,
+        tokenizer,
+        max_seq_length: int,
+        cache_dir: Path,
+        streaming: bool = False,
+    ):
+        """
+        Load and prepare dataset for training.
+        
+        Tokenization runs batched across worker processes and is cached as
+        Arrow files under ``cache_dir``, keyed by the dataset, tokenizer and
+        sequence length, so repeated runs over the same data skip it. Large
+        datasets are streamed and tokenized on the fly instead.
+        """
         # Check if it's a custom dataset first
         dataset_service = get_dataset_service()
         custom_dataset_path = dataset_service.get_dataset_path(data_config.dataset_name)
@@ -410,12 +794,12 @@ class TrainingService:
                     dataset = {"train": dataset}
         elif data_config.dataset_name:
             # Load from HuggingFace
-            logger.info("loading_huggingface_dataset", name=data_config.dataset_name)
-            dataset = load_dataset(data_config.dataset_name)
+            logger.info("loading_huggingface_dataset", name=data_config.dataset_name, streaming=streaming)
+            dataset = load_dataset(data_config.dataset_name, streaming=streaming)
         elif data_config.dataset_path:
             # Load from local file
-            logger.info("loading_local_dataset", path=data_config.dataset_path)
-            dataset = load_dataset("text", data_files=data_config.dataset_path)
+            logger.info("loading_local_dataset", path=data_config.dataset_path, streaming=streaming)
+            dataset = load_dataset("text", data_files=data_config.dataset_path, streaming=streaming)
         else:
             raise ValueError("No dataset source provided")
         
@@ -426,7 +810,7 @@ class TrainingService:
             train_dataset = dataset
         
         # Check if the specified text column exists
-        available_columns = train_dataset.column_names
+        available_columns = train_dataset.column_names or []
         logger.info("dataset_columns", columns=available_columns)
         
         # Auto-detect text column if the specified one doesn't exist
@@ -467,86 +851,135 @@ class TrainingService:
         
         # Take subset if specified
         if data_config.max_samples and train_dataset:
-            train_dataset = train_dataset.select(range(min(data_config.max_samples, len(train_dataset))))
+            if isinstance(train_dataset, IterableDataset):
+                # Stop the stream early rather than materialising a slice
+                train_dataset = train_dataset.take(data_config.max_samples)
+            else:
+                train_dataset = train_dataset.select(range(min(data_config.max_samples, len(train_dataset))))
         
         # Tokenize dataset
         def tokenize_function(examples):
-            return tokenizer(
+            tokenized = tokenizer(
                 examples[text_column],
                 truncation=True,
                 max_length=max_seq_length,
-                padding="max_length",
+                # Padding is applied per batch by the data collator
+                padding=False,
             )
+            # Precomputed lengths let the Trainer bucket batches by size
+            tokenized["length"] = [len(ids) for ids in tokenized["input_ids"]]
+            return tokenized
         
-        tokenized_train = train_dataset.map(
-            tokenize_function,
-            batched=True,
-            remove_columns=train_dataset.column_names,
-        )
+        if isinstance(train_dataset, IterableDataset):
+            # Streamed examples are tokenized lazily as the dataloader pulls them
+            tokenized_train = train_dataset.map(
+                tokenize_function,
+                batched=True,
+                batch_size=_TOKENIZE_BATCH_SIZE,
+                remove_columns=train_dataset.column_names,
+            ).with_format("torch")
+            if data_config.validation_split:
+                logger.info("validation_split_skipped_for_streaming")
+            return {"train": tokenized_train}
         
-        # Handle validation
+        splits = {"train": train_dataset}
         if isinstance(dataset, dict) and "validation" in dataset:
-            tokenized_val = dataset["validation"].map(
+            splits["validation"] = dataset["validation"]
+        
+        # Tokenize each split, dropping that split's own raw columns; the
+        # splits may come from different files with different schemas
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tokenized = DatasetDict({
+            name: split.map(
                 tokenize_function,
                 batched=True,
-                remove_columns=dataset["validation"].column_names,
+                batch_size=_TOKENIZE_BATCH_SIZE,
+                num_proc=_TOKENIZE_NUM_PROC,
+                remove_columns=split.column_names,
+                load_from_cache_file=True,
+                cache_file_name=str(cache_dir / self._tokenized_cache_name(
+                    data_config, split, tokenizer, max_seq_length, text_column
+                )),
             )
+            for name, split in splits.items()
+        })
+        
+        # Handle validation
+        if "validation" in tokenized:
             return {
-                "train": tokenized_train,
-                "validation": tokenized_val,
+                "train": tokenized["train"],
+                "validation": tokenized["validation"],
             }
         elif data_config.validation_split and data_config.validation_split > 0:
             # Create validation split
-            split = tokenized_train.train_test_split(test_size=data_config.validation_split)
+            split = tokenized["train"].train_test_split(test_size=data_config.validation_split)
             return {
                 "train": split["train"],
                 "validation": split["test"],
             }
         else:
-            return {"train": tokenized_train}
+            return {"train": tokenized["train"]}
 
     
+    @staticmethod
+    def _tokenized_cache_name(data_config, split, tokenizer, max_seq_length: int, text_column: str) -> str:
+        """
+        Build the cache file name for a tokenized split.
+        
+        The key covers the dataset source, the split's content fingerprint
+        (which changes with subsetting or a re-drawn validation split), the
+        tokenizer and the tokenization settings.
+        
+        Returns:
+            Arrow file name unique to that combination
+        """
+        key = "\0".join(str(part) for part in (
+            data_config.dataset_name or data_config.dataset_path,
+            getattr(split, "_fingerprint", None),
+            tokenizer.name_or_path,
+            max_seq_length,
+            text_column,
+        ))
+        return f"tok_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.arrow"
+    
     def get_job_status(self, job_id: str) -> Optional[TrainingStatus]:
         """Get status of a training job."""
-        if job_id not in self.jobs:
+        job = self.jobs.get(job_id)
+        if job is None:
             return None
         
-        job = self.jobs[job_id]
-        
         return TrainingStatus(
             job_id=job_id,
-            status=job["status"],
-            progress=job.get("progress", 0.0),
-            current_epoch=job.get("current_epoch"),
-            total_epochs=job.get("request", {}).get("training_params", {}).get("num_epochs"),
-            current_step=job.get("current_step"),
-            total_steps=job.get("total_steps"),
-            loss=job.get("loss"),
-            learning_rate=job.get("learning_rate"),
-            started_at=job.get("started_at"),
-            completed_at=job.get("completed_at"),
-            error_message=job.get("error_message"),
+            status=job.status,
+            progress=job.progress,
+            current_epoch=job.current_epoch,
+            total_epochs=job.request.get("training_params", {}).get("num_epochs"),
+            current_step=job.current_step,
+            total_steps=job.total_steps,
+            loss=job.loss,
+            learning_rate=job.learning_rate,
+            started_at=job.started_at,
+            completed_at=job.completed_at,
+            error_message=job.error_message,
         )
     
     def list_jobs(self) -> List[TrainingJobInfo]:
-        """List all training jobs."""
-        jobs = []
-        for job_id, job in self.jobs.items():
-            jobs.append(
-                TrainingJobInfo(
-                    job_id=job_id,
-                    model_name=job["model_name"],
-                    base_model=job["base_model"],
-                    technique=job["technique"],
-                    status=job["status"],
-                    progress=job.get("progress", 0.0),
-                    created_at=job["created_at"],
-                    started_at=job.get("started_at"),
-                    completed_at=job.get("completed_at"),
-                )
+        """List all training jobs, newest first."""
+        # Jobs are stored in creation order, so no sort is needed
+        return [
+            TrainingJobInfo(
+                job_id=job.job_id,
+                model_name=job.model_name,
+                base_model=job.base_model,
+                technique=job.technique,
+                status=job.status,
+                progress=job.progress,
+                created_at=job.created_at,
+                started_at=job.started_at,
+                completed_at=job.completed_at,
             )
-        
-        return sorted(jobs, key=lambda x: x.created_at, reverse=True)
+            for job in reversed(self.jobs.values())
+        ]
     
     def cancel_job(self, job_id: str) -> bool:
         """Cancel a training job."""
@@ -554,11 +987,11 @@ class TrainingService:
             return False
         
         job = self.jobs[job_id]
-        if job["status"] in ["completed", "failed", "cancelled"]:
+        if job.status in ["completed", "failed", "cancelled"]:
             return False
         
-        job["status"] = "cancelled"
-        job["completed_at"] = datetime.utcnow()
+        job.status = "cancelled"
+        job.completed_at = datetime.utcnow()
         
         logger.info("training_cancelled", job_id=job_id)
         return True
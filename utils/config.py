@@ -1,14 +1,33 @@
 """
-Configuration management using Pydantic Settings.
+Configuration management using a frozen dataclass.
 Loads settings from environment variables and .env file.
 """
+import os
+from dataclasses import dataclass, field, fields
 from functools import lru_cache
-from typing import Optional
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Any, Dict
 
+from dotenv import dotenv_values
 
-class Settings(BaseSettings):
-    """Application settings with validation."""
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off", ""}
+
+
+def _cast(value: str, target: type) -> Any:
+    """Convert a raw environment string to the type of a settings field."""
+    if target is bool:
+        lowered = value.strip().lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid boolean value: {value!r}")
+    return target(value)
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Application settings, parsed once from the environment."""
     
     # Ollama Configuration
     ollama_base_url: str = "http://localhost:11434"
@@ -37,10 +56,14 @@ class Settings(BaseSettings):
     vector_store_path: str = "./data/vector_store"
     keyword_index_path: str = "./data/keyword_index"
     embedding_local_only: bool = True  # Force offline mode for embeddings
+    embed_cache_size: int = 10000  # query embeddings kept in the LRU cache
+    embed_disk_cache_path: str = "./data/embed_cache"  # persistent query embedding cache (empty to disable)
     
     # Hybrid Search Weights (optimized for accuracy)
     semantic_weight: float = 0.65  # weight for semantic similarity
     lexical_weight: float = 0.35   # weight for BM25 keyword matching
+    semantic_cache_threshold: float = 0.95  # cosine similarity for reusing cached search results
+    semantic_cache_ttl: float = 60.0  # seconds a cached search result stays valid
     
     # Extraction Settings
     use_ocr: bool = False  # enable OCR for scanned PDFs (requires tesseract)
@@ -52,22 +75,57 @@ class Settings(BaseSettings):
     default_top_k: int = 10  # default number of search results
     min_search_score: float = 0.3  # minimum relevance score threshold
     
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        case_sensitive=False,
-        extra="ignore"
-    )
+    # Derived values, computed once in __post_init__
+    ollama_api_url: str = field(init=False, repr=False)  # Ollama API base URL
+    max_prompt_size_bytes: int = field(init=False, repr=False)  # max prompt size in bytes
+    sw: float = field(init=False, repr=False)  # semantic weight normalized to sum to 1 with lw
+    lw: float = field(init=False, repr=False)  # lexical weight normalized to sum to 1 with sw
     
-    @property
-    def ollama_api_url(self) -> str:
-        """Get the Ollama API base URL."""
-        return f"{self.ollama_base_url}/api"
+    def __post_init__(self):
+        object.__setattr__(self, "ollama_api_url", f"{self.ollama_base_url}/api")
+        object.__setattr__(self, "max_prompt_size_bytes", self.max_prompt_size_mb * 1024 * 1024)
+        norm = self.semantic_weight + self.lexical_weight
+        if norm > 0:
+            sw, lw = self.semantic_weight / norm, self.lexical_weight / norm
+        else:
+            # Both weights disabled: fall back to an even blend
+            sw = lw = 0.5
+        object.__setattr__(self, "sw", sw)
+        object.__setattr__(self, "lw", lw)
     
-    @property
-    def max_prompt_size_bytes(self) -> int:
-        """Get max prompt size in bytes."""
-        return self.max_prompt_size_mb * 1024 * 1024
+    @classmethod
+    def from_env(cls, env_file: str = ".env") -> "Settings":
+        """
+        Build settings from the .env file and process environment.
+        
+        Variable names are matched case-insensitively, environment variables
+        take precedence over the .env file, and unknown keys are ignored.
+        
+        Args:
+            env_file: Path to the .env file (missing file is fine)
+            
+        Returns:
+            Settings instance
+        """
+        raw: Dict[str, str] = {}
+        for source in (dotenv_values(env_file, encoding="utf-8"), os.environ):
+            for key, value in source.items():
+                if value is not None:
+                    raw[key.lower()] = value
+        
+        values: Dict[str, Any] = {}
+        for f in fields(cls):
+            if not f.init:
+                continue
+            value = raw.get(f.name.lower())
+            if value is None:
+                continue
+            try:
+                values[f.name] = _cast(value, f.type)
+            except ValueError as e:
+                raise ValueError(f"Invalid value for setting '{f.name}': {e}") from e
+        
+        return cls(**values)
 
 
 @lru_cache()
@@ -76,4 +134,4 @@ def get_settings() -> Settings:
     Get cached settings instance.
     Uses lru_cache to ensure single instance across app.
     """
-    return Settings()
+    return Settings.from_env()
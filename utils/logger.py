@@ -4,24 +4,72 @@ Provides consistent, JSON-formatted logs for production.
 """
 import logging
 import sys
+import threading
 from typing import Any
 
+import orjson
 import structlog
 from structlog.types import EventDict, Processor
 
 from utils.config import get_settings
 
+# Settings-independent processors that run before the app context
+_PRE_CONTEXT_PROCESSORS: tuple[Processor, ...] = (
+    structlog.contextvars.merge_contextvars,
+    structlog.stdlib.add_log_level,
+    structlog.stdlib.add_logger_name,
+)
+
+# Settings-independent processors that run after the app context
+_POST_CONTEXT_PROCESSORS: tuple[Processor, ...] = (
+    structlog.processors.TimeStamper(fmt="iso"),
+    structlog.processors.StackInfoRenderer(),
+    structlog.processors.format_exc_info,
+    structlog.processors.UnicodeDecoder(),
+)
+
+# Logging is configured once per process, whichever entrypoint gets there first
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    """Serialize a log event with orjson, falling back to repr() for unknown types."""
+    return orjson.dumps(obj, default=repr, option=orjson.OPT_SERIALIZE_NUMPY).decode()
 
-def add_app_context(logger: Any, method_name: str, event_dict: EventDict) -> EventDict:
-    """Add application context to all log entries."""
-    settings = get_settings()
-    event_dict["app"] = settings.app_name
-    event_dict["version"] = settings.app_version
-    return event_dict
+
+def _make_app_context_processor(app_name: str, app_version: str) -> Processor:
+    """
+    Build a processor that adds application context to all log entries.
+    The values are captured once so the processor does no settings lookup
+    per log record.
+    """
+    def add_app_context(logger: Any, method_name: str, event_dict: EventDict) -> EventDict:
+        event_dict["app"] = app_name
+        event_dict["version"] = app_version
+        return event_dict
+    
+    return add_app_context
 
 
 def configure_logging() -> None:
-    """Configure structured logging for the application."""
+    """
+    Configure structured logging for the application.
+    Safe to call from multiple entrypoints; only the first call has effect.
+    """
+    global _configured
+    if _configured:
+        return
+    
+    with _configure_lock:
+        if _configured:
+            return
+        _configure_logging()
+        _configured = True
+
+
+def _configure_logging() -> None:
+    """Build the processor chain and apply the logging configuration."""
     settings = get_settings()
     
     # Configure standard logging
@@ -33,22 +81,17 @@ def configure_logging() -> None:
     
     # Configure structlog
     processors: list[Processor] = [
-        structlog.contextvars.merge_contextvars,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.add_logger_name,
-        add_app_context,
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
+        *_PRE_CONTEXT_PROCESSORS,
+        _make_app_context_processor(settings.app_name, settings.app_version),
+        *_POST_CONTEXT_PROCESSORS,
     ]
     
     if settings.debug:
         # Human-readable output for development
         processors.append(structlog.dev.ConsoleRenderer())
     else:
-        # JSON output for production
-        processors.append(structlog.processors.JSONRenderer())
+        # JSON output for production; orjson serializes far faster than stdlib json
+        processors.append(structlog.processors.JSONRenderer(serializer=_orjson_dumps))
     
     structlog.configure(
         processors=processors,
@@ -0,0 +1,161 @@
+"""
+Embedding-keyed semantic cache.
+Returns a stored value when a new query embedding is close enough to a
+previously cached one, so near-duplicate queries skip the full search.
+"""
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    FIFO ring buffer of (embedding, value) pairs matched by cosine similarity.
+
+    Entries are grouped by a hashable namespace (e.g. collection and search
+    parameters); a lookup only matches entries from the same namespace.
+    A namespace is forgotten once its last entry is evicted. With a ``ttl``,
+    entries older than that many seconds never match.
+    The embedding table grows on demand up to ``capacity`` rows, after which
+    the oldest entry is overwritten on insert. Embeddings are stored as
+    float16, which halves the table and the memory scanned per lookup at a
+    similarity error far below the hit threshold's resolution.
+    """
+
+    _INITIAL_ROWS = 1024
+
+    def __init__(
+        self,
+        dim: int,
+        threshold: float = 0.95,
+        capacity: int = 50000,
+        ttl: Optional[float] = None
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            dim: Embedding dimension
+            threshold: Minimum cosine similarity for a cache hit
+            capacity: Maximum number of cached entries
+            ttl: Seconds an entry stays valid (None for no expiry)
+        """
+        self.dim = dim
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+
+        rows = min(self._INITIAL_ROWS, capacity)
+        self._embeddings = np.zeros((rows, dim), dtype=np.float16)
+        self._namespaces = np.full(rows, -1, dtype=np.int64)
+        self._inserted_at = np.zeros(rows, dtype=np.float64)
+        self._values: List[Any] = [None] * rows
+        self._namespace_ids: Dict[Hashable, int] = {}
+        self._namespace_counts: Dict[int, int] = {}
+        self._namespace_keys: Dict[int, Hashable] = {}
+        self._next_namespace_id = 0
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _normalize(self, embedding: np.ndarray) -> np.ndarray:
+        """L2-normalize an embedding so dot products are cosine similarities."""
+        vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def lookup(self, embedding: np.ndarray, namespace: Hashable = None) -> Optional[Any]:
+        """
+        Find the cached value for the most similar embedding.
+
+        Args:
+            embedding: Query embedding
+            namespace: Namespace the entry must belong to
+
+        Returns:
+            Cached value, or None if no entry is within the threshold
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            ns_id = self._namespace_ids.get(namespace)
+            if ns_id is None or self._size == 0:
+                return None
+
+            sims = self._embeddings[:self._size] @ query
+            sims[self._namespaces[:self._size] != ns_id] = -np.inf
+            if self.ttl is not None:
+                sims[self._inserted_at[:self._size] < time.monotonic() - self.ttl] = -np.inf
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            return self._values[best]
+
+    def insert(self, embedding: np.ndarray, value: Any, namespace: Hashable = None):
+        """
+        Cache a value under an embedding, evicting the oldest entry when full.
+
+        Args:
+            embedding: Query embedding
+            value: Value to cache
+            namespace: Namespace to store the entry under
+        """
+        vec = self._normalize(embedding)
+        with self._lock:
+            if self._next == len(self._values) and len(self._values) < self.capacity:
+                self._grow()
+
+            slot = self._next
+            if slot < self._size:
+                # Overwriting the oldest entry
+                self._release_namespace(int(self._namespaces[slot]))
+
+            ns_id = self._namespace_ids.get(namespace)
+            if ns_id is None:
+                ns_id = self._next_namespace_id
+                self._next_namespace_id += 1
+                self._namespace_ids[namespace] = ns_id
+                self._namespace_keys[ns_id] = namespace
+                self._namespace_counts[ns_id] = 0
+
+            self._embeddings[slot] = vec.astype(np.float16)
+            self._namespaces[slot] = ns_id
+            self._inserted_at[slot] = time.monotonic()
+            self._values[slot] = value
+            self._namespace_counts[ns_id] += 1
+
+            self._size = max(self._size, slot + 1)
+            self._next = (slot + 1) % self.capacity
+
+    def _release_namespace(self, ns_id: int):
+        """Drop one entry's reference to a namespace, forgetting it when unused."""
+        remaining = self._namespace_counts[ns_id] - 1
+        if remaining:
+            self._namespace_counts[ns_id] = remaining
+        else:
+            del self._namespace_counts[ns_id]
+            del self._namespace_ids[self._namespace_keys.pop(ns_id)]
+
+    def _grow(self):
+        """Double the table size, up to capacity."""
+        rows = min(len(self._values) * 2, self.capacity)
+        extra = rows - len(self._values)
+        self._embeddings = np.vstack([self._embeddings, np.zeros((extra, self.dim), dtype=np.float16)])
+        self._namespaces = np.concatenate([self._namespaces, np.full(extra, -1, dtype=np.int64)])
+        self._inserted_at = np.concatenate([self._inserted_at, np.zeros(extra, dtype=np.float64)])
+        self._values.extend([None] * extra)
+
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self._namespaces[:] = -1
+            self._values = [None] * len(self._values)
+            self._namespace_ids.clear()
+            self._namespace_counts.clear()
+            self._namespace_keys.clear()
+            self._size = 0
+            self._next = 0
+
+    def __len__(self) -> int:
+        return self._size